@@ -1,10 +1,11 @@
-import matplotlib.pyplot as plt
-import numpy as np
-import pandas as pd
+from atmosphere import R, T0, Ws, aT, gamma, p0, rho0
+from datasheet import load_reference_data
+from trim_curve import SHIFT_ROWS, elevator_trim_curve, read_trim_series
+from units import deg_to_rad, ft_to_m, g0, kts_to_ms, lbs_to_kg, rad_to_deg
 
 def readData(filename):
-    data = pd.read_excel(filename)
-    dimensions = data.iloc[3:7,3]
+    data = load_reference_data(filename)
+    dimensions = data.block(slice(3, 7), 3)
 
     print(dimensions)
     
@@ -13,27 +14,29 @@ def readData(filename):
     
     
     
-#Unit Conversion
-lbs_kg = 0.453592
-ft_m = 0.3048
-kts_ms = 0.514444444 
-rad_alpha = 180/np.pi
-alpha_rad = np.pi/180
+#Unit Conversion, shared with the other modules through units
+lbs_kg = lbs_to_kg
+ft_m = ft_to_m
+kts_ms = kts_to_ms
+rad_alpha = rad_to_deg
+alpha_rad = deg_to_rad
 
+#constants (ISA, standard weight Ws and g0) come from atmosphere and units
+S = 30.00 #m^2
+c = 2.0569 #m, MAC
 
-#constants
-Ws = 60500#N
-g0 = 9.80665
-T0 = 288.15 #K
-rho0 = 1.225 #kg/m^3
-p0 = 101325 #Pa
-aT = -0.0065 #K/m
-R = 287
-gamma = 1.4
+#Experiment payload, Steven moves from seat 8 to between the pilots for the cg shift
+payload_masses = [104, 93, 63, 82, 76, 83, 83, 89, 85] #kg
+payload_data = [131, 131, 214, 214, 251, 251, 288, 288, 170] #inch
+payload_data_shift = [payload_data, [131, 131, 214, 214, 251, 251, 288, 131, 170]] #inch
+fuel_start = 4050 * lbs_kg * g0 #N
 
 refdata = 'ReferenceAircraftDataSheet.xlsx'
 #Read Data
 if __name__ == "__main__":
-    #test = elevator_trim_curve(data)
     readData(refdata)
+    data = load_reference_data(refdata)
+    test = elevator_trim_curve(read_trim_series(data), read_trim_series(data, SHIFT_ROWS), fuel_start, payload_masses,
+                               payload_data, payload_data_shift, S, c)
+    print(f"Cm_delta = {test.Cm_delta[0]:.4f} 1/rad, Cm_alpha = {test.Cm_alpha[0]:.4f} 1/rad")
 
@@ -0,0 +1,158 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from units import g0
+
+# International Standard Atmosphere, troposphere
+T0 = 288.15  # [K]
+rho0 = 1.225  # [kg/m^3]
+p0 = 101325  # [Pa]
+aT = -0.0065  # [K/m]
+R = 287  # [J/kg/K]
+gamma = 1.4  # [-]
+
+# Standard aircraft weight the airspeeds are reduced to
+Ws = 60500  # [N]
+
+# Exponents of the power terms, computed once
+_pressure_exponent = -g0 / (aT * R)  # [-]
+_impact_exponent = gamma / (gamma - 1)  # [-]
+_mach_exponent = (gamma - 1) / gamma  # [-]
+_impact_factor = (gamma - 1) / (2 * gamma) * rho0 / p0  # [s^2/m^2]
+
+
+class Atmosphere(NamedTuple):
+    """ISA conditions at a pressure altitude."""
+    T: np.ndarray  # [K]
+    p: np.ndarray  # [Pa]
+    rho: np.ndarray  # [kg/m^3]
+
+
+class AirspeedReduction(NamedTuple):
+    """Airspeeds of flight test samples reduced to standard conditions."""
+    p: np.ndarray  # [Pa], static pressure
+    M: np.ndarray  # [-], Mach number
+    T: np.ndarray  # [K], static air temperature
+    rho: np.ndarray  # [kg/m^3]
+    V_t: np.ndarray  # [m/s], true airspeed
+    V_e: np.ndarray  # [m/s], equivalent airspeed
+    V_e_reduced: np.ndarray  # [m/s], equivalent airspeed at the standard weight Ws
+
+
+class AtmosphereTables(NamedTuple):
+    """Interpolation tables replacing the power terms of the airspeed reduction."""
+    pressure: object  # pressure altitude [m] -> static pressure [Pa]
+    mach: object  # impact to static pressure ratio qc/p [-] -> Mach number [-]
+
+
+def isa(hp):
+    """
+    ISA temperature, pressure and density in the troposphere.
+
+    :param hp: pressure altitude, scalar or array [m]
+    :return: Atmosphere
+    """
+    T = T0 + aT * np.asarray(hp, dtype=float)  # [K]
+    p = p0 * (T / T0) ** _pressure_exponent  # [Pa]
+    return Atmosphere(T, p, p / (R * T))
+
+
+def pressure(hp):
+    """
+    :param hp: pressure altitude, scalar or array [m]
+    :return: ISA static pressure [Pa]
+    """
+    return p0 * (1 + aT / T0 * np.asarray(hp, dtype=float)) ** _pressure_exponent
+
+
+def impact_pressure(V_c):
+    """
+    :param V_c: calibrated airspeed, scalar or array [m/s]
+    :return: impact pressure qc [Pa]
+    """
+    V_c = np.asarray(V_c, dtype=float)
+    return p0 * ((1 + _impact_factor * V_c * V_c) ** _impact_exponent - 1)
+
+
+def mach(qc_p):
+    """
+    :param qc_p: impact to static pressure ratio qc/p, scalar or array [-]
+    :return: Mach number [-]
+    """
+    return np.sqrt(_mach_squared(np.asarray(qc_p, dtype=float)))
+
+
+def lookup_table(func, start, stop, step):
+    """
+    Tabulate a smooth function once on an evenly spaced grid and evaluate it by linear
+    interpolation. The grid index is computed directly instead of searched for, so a query costs a
+    few array operations; outside the table the end segments are extrapolated.
+
+    :param func: vectorized function of one variable
+    :param start: first tabulated value
+    :param stop: last tabulated value
+    :param step: spacing of the table, sets the interpolation error (about step**2 * f'' / 8)
+    :return: function evaluating the table, array in array out
+    """
+    x = np.arange(start, stop + step, step, dtype=float)
+    y = func(x)
+    dy = np.append(np.diff(y), y[-1] - y[-2])
+    inverse_step = 1 / step
+    last = len(x) - 2
+
+    def table(value):
+        u = (np.asarray(value, dtype=float) - start) * inverse_step
+        i = np.clip(u.astype(np.intp), 0, last)
+        return y[i] + (u - i) * dy[i]
+    return table
+
+
+def _mach_squared(qc_p):
+    """Square of the Mach number, smooth down to M = 0 and therefore tabulated instead of M."""
+    return 2 / (gamma - 1) * ((1 + qc_p) ** _mach_exponent - 1)
+
+
+def atmosphere_tables(hp_max=13000, hp_step=10, qc_p_max=2.0, qc_p_step=1e-4):
+    """
+    Lookup tables for reduce_airspeed. With the default spacing the pressure is within about 3e-7
+    and the Mach number above M = 0.05 within about 3e-7 of the exact power terms.
+
+    NumPy evaluates the power terms at roughly the cost of a table lookup on common hardware, so
+    the exact terms are the default; the tables bound the cost where pow is slow.
+
+    :param hp_max: highest pressure altitude of the table [m]
+    :param hp_step: altitude spacing [m]
+    :param qc_p_max: highest impact to static pressure ratio of the table [-], 2 covers M = 1.3
+    :param qc_p_step: pressure ratio spacing [-]
+    :return: AtmosphereTables
+    """
+    mach_squared = lookup_table(_mach_squared, 0, qc_p_max, qc_p_step)
+    return AtmosphereTables(lookup_table(pressure, -1000, hp_max, hp_step),
+                            lambda qc_p: np.sqrt(np.maximum(mach_squared(qc_p), 0)))
+
+
+def reduce_airspeed(hp, V_c, TAT, W, Ws=Ws, tables=None):
+    """
+    Reduce measured airspeeds to the equivalent airspeed at the standard aircraft weight.
+
+    All inputs broadcast, so a whole campaign of samples is reduced in one pass.
+
+    :param hp: pressure altitude [m]
+    :param V_c: calibrated airspeed [m/s]
+    :param TAT: total (measured) air temperature [K]
+    :param W: aircraft weight [N]
+    :param Ws: standard aircraft weight [N]
+    :param tables: AtmosphereTables from atmosphere_tables to interpolate the power terms,
+        None to evaluate them exactly
+    :return: AirspeedReduction
+    """
+    p = pressure(hp) if tables is None else tables.pressure(hp)  # [Pa]
+    qc_p = impact_pressure(V_c) / p  # [-]
+    M = mach(qc_p) if tables is None else tables.mach(qc_p)  # [-]
+
+    T = np.asarray(TAT, dtype=float) / (1 + (gamma - 1) / 2 * M * M)  # [K]
+    rho = p / (R * T)  # [kg/m^3]
+    V_t = M * np.sqrt(gamma * R * T)  # [m/s]
+    V_e = V_t * np.sqrt(rho / rho0)  # [m/s]
+    return AirspeedReduction(p, M, T, rho, V_t, V_e, V_e * np.sqrt(Ws / np.asarray(W, dtype=float)))
@@ -0,0 +1,182 @@
+from dataclasses import replace
+from typing import NamedTuple
+
+import numpy as np
+
+from instrumentation import timed
+from load_diagram import Battery, compute_load_diagram
+from units import g0, mac_fraction
+
+
+class BatteryEnvelope(NamedTuple):
+    """Cg range of the load diagram per battery candidate."""
+    min_cg: np.ndarray  # [-], x_cg/MAC
+    max_cg: np.ndarray  # [-]
+    min_margin_cg: np.ndarray  # [-]
+    max_margin_cg: np.ndarray  # [-]
+    fuel_weight: np.ndarray  # [N], negative where the batteries leave no fuel within MTOW
+
+
+class LoadingIncrements(NamedTuple):
+    """Weight and moment added at every load diagram point relative to the OEW, without batteries."""
+    weight: np.ndarray  # [N], every cargo and passenger curve point
+    moment: np.ndarray  # [N], weight * x_cg/MAC
+    final_weight: float  # [N], all payload on board
+    final_moment: float  # [N]
+
+
+class BatteryPlacement(NamedTuple):
+    """Best battery placement found by optimize_battery_placement."""
+    config: object  # LoadingConfiguration with the placed batteries
+    forward_mass: float  # [kg]
+    aft_mass: float  # [kg]
+    forward_arm: float  # [m]
+    aft_arm: float  # [m]
+    cg_range: float  # [-], max_margin_cg - min_margin_cg
+    Sh_S: float  # [-], minimum tail area ratio, NaN without tail parameters
+    evaluations: int  # number of candidates scored
+
+
+def loading_increments(config):
+    """
+    Load diagram increments of a configuration. The batteries only move the starting point of the
+    loading curves, so these are computed once and reused for every battery candidate.
+
+    :param config: LoadingConfiguration
+    :return: LoadingIncrements
+    """
+    diagram = compute_load_diagram(replace(config, batteries=()))
+    xcg_oew, oew_weight = diagram.oew
+    curves = list(diagram.cargo.values()) + list(diagram.passengers.values())
+    weight = np.concatenate([curve.weight for curve in curves]) - oew_weight
+    moment = np.concatenate([curve.moment for curve in curves]) - xcg_oew * oew_weight
+    return LoadingIncrements(weight, moment, diagram.fuel.weight[0] - oew_weight,
+                             diagram.fuel.moment[0] - xcg_oew * oew_weight)
+
+
+@timed()
+def battery_envelopes(config, forward_mass, aft_mass, forward_arm, aft_arm, increments=None):
+    """
+    Cg range of the load diagram for many battery masses and locations at once, the same numbers as
+    compute_load_diagram with those batteries.
+
+    :param config: LoadingConfiguration, its own batteries are ignored
+    :param forward_mass: forward battery masses, shape (C,) [kg]
+    :param aft_mass: aft battery masses, shape (C,) [kg]
+    :param forward_arm: forward battery locations, shape (C,) [m]
+    :param aft_arm: aft battery locations, shape (C,) [m]
+    :param increments: LoadingIncrements of the configuration, computed when not given
+    :return: BatteryEnvelope of arrays of shape (C,)
+    """
+    increments = increments or loading_increments(config)
+    forward_weight = np.asarray(forward_mass, dtype=float) * g0
+    aft_weight = np.asarray(aft_mass, dtype=float) * g0
+
+    # OEW point with the batteries, the start of every loading curve
+    oew_weight = config.OEW * g0 + forward_weight + aft_weight
+    oew_moment = (config.OEW * g0 * mac_fraction(config.oew_arm, config.x_LEMAC, config.MAC)
+                  + forward_weight * mac_fraction(forward_arm, config.x_LEMAC, config.MAC)
+                  + aft_weight * mac_fraction(aft_arm, config.x_LEMAC, config.MAC))
+    xcg = (oew_moment[:, None] + increments.moment) / (oew_weight[:, None] + increments.weight)
+
+    # Fuel after all payload, reduced to stay within MTOW unless the fuel mass is fixed
+    if config.fuel_mass is None:
+        fuel_weight = config.MTOW * g0 - oew_weight - config.max_payload * g0
+    else:
+        fuel_weight = np.full(oew_weight.shape, config.fuel_mass * g0)
+    xcg_fuel = ((oew_moment + increments.final_moment
+                 + fuel_weight * mac_fraction(config.fuel_arm, config.x_LEMAC, config.MAC))
+                / (oew_weight + increments.final_weight + fuel_weight))
+
+    min_cg = np.minimum(xcg.min(axis=1), xcg_fuel)
+    max_cg = np.maximum(xcg.max(axis=1), xcg_fuel)
+    if config.margin_type == "relative":
+        return BatteryEnvelope(min_cg, max_cg, min_cg * (1 - config.margin), max_cg * (1 + config.margin), fuel_weight)
+    if config.margin_type == "mac":
+        return BatteryEnvelope(min_cg, max_cg, min_cg - config.margin * config.MAC, max_cg + config.margin * config.MAC,
+                               fuel_weight)
+    raise ValueError(f"Unknown margin type {config.margin_type!r}")
+
+
+@timed()
+def optimize_battery_placement(config, forward_arm_bounds=None, aft_arm_bounds=None, total_mass=None,
+                               split_bounds=(0, 1), tail=None, population=5000, generations=25, elite=0.05,
+                               rng=None):
+    """
+    Search the battery mass split and the battery locations with the smallest cg range.
+
+    A cross-entropy search: every generation a population of candidates is drawn from a normal
+    distribution within the bounds, all are scored in one battery_envelopes call, and the
+    distribution is refitted to the best fraction. With tail parameters the score is the minimum
+    tail area of the scissor plot, which grows with the cg range.
+
+    :param config: LoadingConfiguration with a forward and an aft battery
+    :param forward_arm_bounds: (lowest, highest) forward battery location [m], 2 m around the
+        configuration's by default
+    :param aft_arm_bounds: (lowest, highest) aft battery location [m], 2 m around the
+        configuration's by default
+    :param total_mass: total battery mass [kg], the configuration's by default
+    :param split_bounds: (lowest, highest) fraction of the battery mass in the forward battery
+    :param tail: dict of the minimum_tail_area arguments other than MAC, cg_min and cg_max, or None
+    :param population: candidates per generation
+    :param generations: number of generations
+    :param elite: fraction of the population the distribution is refitted to
+    :param rng: numpy Generator or seed
+    :return: BatteryPlacement
+    """
+    rng = np.random.default_rng(rng)
+    forward, aft = config.batteries
+    total_mass = forward.mass + aft.mass if total_mass is None else total_mass
+    forward_arm_bounds = forward_arm_bounds or (forward.arm - 2, forward.arm + 2)
+    aft_arm_bounds = aft_arm_bounds or (aft.arm - 2, aft.arm + 2)
+    lower, upper = np.array([split_bounds, forward_arm_bounds, aft_arm_bounds], dtype=float).T
+    increments = loading_increments(config)
+
+    def score(candidates):
+        split, forward_arm, aft_arm = candidates.T
+        envelope = battery_envelopes(config, split * total_mass, (1 - split) * total_mass, forward_arm, aft_arm,
+                                     increments)
+        cg_range = envelope.max_margin_cg - envelope.min_margin_cg
+        if tail is None:
+            value = cg_range
+        else:
+            from scissor_plot import minimum_tail_area
+
+            value = minimum_tail_area(MAC=config.MAC, cg_min=envelope.min_margin_cg, cg_max=envelope.max_margin_cg,
+                                      **tail).Sh_S
+        return np.where((envelope.fuel_weight >= 0) & ~np.isnan(value), value, np.inf), cg_range
+
+    # Start from the configuration's split, or the middle of the bounds without battery mass
+    battery_mass = forward.mass + aft.mass
+    split = forward.mass / battery_mass if battery_mass > 0 else (lower[0] + upper[0]) / 2
+    mean = np.array([split, forward.arm, aft.arm]).clip(lower, upper)
+    std = (upper - lower) / 2
+    best, best_score = mean, np.inf
+    no_elite = max(2, int(elite * population))
+    for _ in range(generations):
+        candidates = np.clip(rng.normal(mean, std, (population, 3)), lower, upper)
+        values = score(candidates)[0]
+        order = np.argsort(values)[:no_elite]
+        if values[order[0]] < best_score:
+            best, best_score = candidates[order[0]], values[order[0]]
+        mean = candidates[order].mean(axis=0)
+        std = candidates[order].std(axis=0) + 1e-9 * (upper - lower)
+
+    split, forward_arm, aft_arm = (float(x) for x in best)
+    value, cg_range = score(best[None, :])
+    placed = replace(config, batteries=(Battery(forward.name, split * total_mass, forward_arm),
+                                        Battery(aft.name, (1 - split) * total_mass, aft_arm)))
+    return BatteryPlacement(placed, split * total_mass, (1 - split) * total_mass, forward_arm, aft_arm,
+                            float(cg_range[0]), float(value[0]) if tail is not None else np.nan,
+                            population * generations)
+
+
+if __name__ == "__main__":
+    from load_diagram import crjexx
+
+    config = crjexx()
+    diagram = compute_load_diagram(config)
+    result = optimize_battery_placement(config, rng=0)
+    print(f"Forward battery {result.forward_mass:.0f} kg at {result.forward_arm:.3f} m, "
+          f"aft battery {result.aft_mass:.0f} kg at {result.aft_arm:.3f} m")
+    print(f"cg range {result.cg_range:.4f}, {diagram.max_margin_cg - diagram.min_margin_cg:.4f} as designed")
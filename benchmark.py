@@ -0,0 +1,384 @@
+"""
+Benchmarks of the cg, load diagram, scissor and data sheet computations.
+
+    python benchmark.py                          # run all, write benchmark_results.json
+    python benchmark.py --quick -k cg            # small sizes, only benchmarks with 'cg' in the name
+    python benchmark.py --compare old.json       # also print the speed-up against an earlier run
+    python benchmark.py --imports                # check the import time budget, exit 1 if exceeded,
+                                                 # write import_results.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import replace
+
+import numpy as np
+
+import mass_calculation
+from battery_placement import battery_envelopes, loading_increments
+from envelope import Envelope
+from fuel_system import FuelSchedule, cg_trajectories, wing_tanks
+from hybrid_mission import MissionProfile, simulate_missions
+from load_allocation import allocate_load
+from load_diagram import cabin_rows, compute_load_diagram, crj1000, crjexx
+from scissor_plot import scissor_sweep
+
+# Experiment payload of mass_calculation, used for the cg benchmarks
+payload_masses = [104, 93, 63, 82, 76, 83, 83, 89, 85]  # [kg]
+payload_data = [131, 131, 214, 214, 251, 251, 288, 288, 170]  # [inch]
+fuel_start = 18015.29754  # [N]
+
+
+def bench_cg_scalar(size):
+    """calculate_cg called once per case."""
+    fuel_used = np.linspace(0, fuel_start, size).tolist()
+
+    def run():
+        for f in fuel_used:
+            mass_calculation.calculate_cg(f, fuel_start, payload_masses, payload_data)
+    return run
+
+
+def bench_cg_batch(size):
+    """calculate_cg_batch on all cases at once."""
+    fuel_used = np.linspace(0, fuel_start, size)
+    masses = np.tile(payload_masses, (size, 1))
+
+    def run():
+        mass_calculation.calculate_cg_batch(fuel_used, fuel_start, masses, payload_data)
+    return run
+
+
+def bench_fuel_schedules(size):
+    """cg_trajectories of size random two-tank schedules over 1000 fuel used samples."""
+    rng = np.random.default_rng(0)
+    tanks = wing_tanks()
+    schedules = [FuelSchedule([fuel_start / 2] * 2, -np.column_stack([rng.dirichlet(np.ones(5)) * fuel_start / 2
+                                                                    for _ in tanks])) for _ in range(size)]
+    fuel_used = np.linspace(0, fuel_start, 1000)
+
+    def run():
+        cg_trajectories(tanks, schedules, fuel_used, payload_masses, payload_data)
+    return run
+
+
+def bench_load_diagram(size):
+    """compute_load_diagram for a configuration with size seat rows."""
+    config = replace(crj1000(), max_payload=88 * 4 * size + 1000, seat_rows=cabin_rows(11.6846, 11.6846 + 0.8 * size, size))
+
+    def run():
+        compute_load_diagram(config)
+    return run
+
+
+def bench_load_diagram_variants(size):
+    """compute_load_diagram for size CRJ1000/CRJEXX configurations."""
+    configs = [crj1000(), crjexx()] * (size // 2)
+
+    def run():
+        for config in configs:
+            compute_load_diagram(config)
+    return run
+
+
+def bench_allocate_load(size):
+    """allocate_load for size CRJ1000 flights with random bookings and targets."""
+    diagram = compute_load_diagram(crj1000())
+    rng = np.random.default_rng(0)
+    flights = list(zip(rng.integers(0, 101, size).tolist(), rng.uniform(0, 1000, size).tolist(),
+                       rng.uniform(0.2, 0.5, size).tolist()))
+
+    def run():
+        for no_pass, cargo_mass, target_cg in flights:
+            allocate_load(diagram, no_pass, cargo_mass, target_cg, fuel_mass=3000)
+    return run
+
+
+def bench_envelope(size):
+    """Envelope.check of size (xcg, weight) points against the CRJ1000 limits."""
+    envelope = Envelope.from_limits(compute_load_diagram(crj1000()))
+    rng = np.random.default_rng(0)
+    xcg = rng.uniform(0, 0.6, size)
+    weight = rng.uniform(2e5, 4.2e5, size)
+
+    def run():
+        envelope.check(xcg, weight)
+    return run
+
+
+def bench_hybrid_missions(size):
+    """simulate_missions of size missions by size battery splits of the CRJEXX, 241 time steps."""
+    config = crjexx()
+    time_steps = np.linspace(0, 7200, 241)
+    missions = [MissionProfile(time_steps, np.full(241, 0.5), np.full(241, 3e5))] * size
+    forward_mass = np.linspace(500, 2000, size)
+    envelope = Envelope.from_limits(compute_load_diagram(config))
+
+    def run():
+        simulate_missions(config, missions, forward_mass, 3000 - forward_mass, 8000, 23.5, envelope=envelope)
+    return run
+
+
+def bench_battery_envelopes(size):
+    """battery_envelopes of size battery placements of the CRJEXX."""
+    config = crjexx()
+    increments = loading_increments(config)
+    rng = np.random.default_rng(0)
+    forward_mass = rng.uniform(0, 3000, size)
+    forward_arm = rng.uniform(12, 17, size)
+    aft_arm = rng.uniform(25, 29, size)
+
+    def run():
+        battery_envelopes(config, forward_mass, 3000 - forward_mass, forward_arm, aft_arm, increments)
+    return run
+
+
+def bench_scissor_sweep(size):
+    """scissor_sweep over size parameter combinations."""
+    rng = np.random.default_rng(0)
+    SM = rng.uniform(0.02, 0.1, size)
+    CL_h = rng.uniform(-1.0, -0.5, size)
+
+    def run():
+        scissor_sweep(0.25, 4.5, 5.0, 0.3, 15.0, 3.48, 0.95, SM, CL_h, -0.27, 1.47, 0.2, 0.5)
+    return run
+
+
+def bench_datasheet(size):
+    """load_reference_data of a synthetic size x 14 sheet, from the .npz cache."""
+    import datasheet
+
+    directory = tempfile.TemporaryDirectory()
+    sheet = _synthetic_sheet(directory.name, size)
+    datasheet.load_reference_data(sheet)
+
+    def run():
+        datasheet._loaded.clear()
+        datasheet.load_reference_data(sheet)
+    run.cleanup = directory.cleanup
+    return run
+
+
+def bench_datasheet_parse(size):
+    """load_reference_data of a synthetic size x 14 sheet, parsing the Excel file."""
+    import datasheet
+
+    directory = tempfile.TemporaryDirectory()
+    sheet = _synthetic_sheet(directory.name, size)
+
+    def run():
+        datasheet._loaded.clear()
+        datasheet.load_reference_data(sheet, cache=False)
+    run.cleanup = directory.cleanup
+    return run
+
+
+def _synthetic_sheet(directory, rows):
+    """Write an Excel sheet of random numbers to a directory."""
+    import pandas as pd
+
+    filename = os.path.join(directory, f"sheet{rows}.xlsx")
+    values = np.random.default_rng(0).uniform(0, 1, (rows, 14))
+    pd.DataFrame(values, columns=[f"c{i}" for i in range(14)]).to_excel(filename, index=False)
+    return filename
+
+
+# name -> (benchmark, sizes, quick sizes)
+BENCHMARKS = {
+    "cg_scalar": (bench_cg_scalar, [100, 1000, 10000], [100]),
+    "cg_batch": (bench_cg_batch, [100, 10000, 1000000], [100, 10000]),
+    "fuel_schedules": (bench_fuel_schedules, [10, 1000], [10]),
+    "load_diagram": (bench_load_diagram, [25, 100, 1000], [25]),
+    "load_diagram_variants": (bench_load_diagram_variants, [10, 100], [10]),
+    "allocate_load": (bench_allocate_load, [100, 1000], [100]),
+    "envelope": (bench_envelope, [1000, 1000000], [1000]),
+    "hybrid_missions": (bench_hybrid_missions, [10, 100], [10]),
+    "battery_envelopes": (bench_battery_envelopes, [1000, 100000], [1000]),
+    "scissor_sweep": (bench_scissor_sweep, [1000, 100000, 1000000], [1000]),
+    "datasheet_cached": (bench_datasheet, [40, 1000], [40]),
+    "datasheet_parse": (bench_datasheet_parse, [40, 1000], [40]),
+}
+
+
+# Import time budget per module [ms], with NumPy already imported
+IMPORT_BUDGET = {
+    "mass_calculation": 10,
+    "load_diagram": 15,
+    "trim_curve": 15,
+    "load_allocation": 15,
+    "envelope": 10,
+    "fuel_system": 15,
+    "hybrid_mission": 15,
+    "battery_placement": 20,
+    "loading_state": 10,
+    "load_sheets": 10,
+    "scissor_plot": 10,
+    "variant_study": 20,
+    "Read": 25,
+    "mass_calculation2": 25,
+}
+# Heavy packages that must only be imported on first use
+LAZY_MODULES = ("pandas", "matplotlib", "openpyxl")
+
+
+def measure_import(module, repeat=5):
+    """
+    Import time of a module in a fresh interpreter that has imported NumPy, from python -X importtime.
+
+    :param module: module name
+    :param repeat: number of interpreters started, the fastest counts
+    :return: dict with the import time of the module and of NumPy [s] and the lazy modules that
+        were imported anyway
+    """
+    code = f"import sys, numpy, {module}; print(','.join(name for name in {LAZY_MODULES!r} if name in sys.modules))"
+    best = None
+    for _ in range(repeat):
+        process = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True,
+                                 cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+        cumulative = {}
+        for line in process.stderr.splitlines():
+            if line.startswith("import time:") and "|" in line:
+                _, total, name = line.split("|")
+                # Top level imports only, their cumulative time includes the nested imports
+                if not name.startswith("  ") and total.strip().isdigit():
+                    cumulative[name.strip()] = int(total) * 1e-6
+        result = {"name": "import_" + module, "size": 1, "best": cumulative.get(module, 0.0),
+                  "numpy": cumulative["numpy"],
+                  "loaded": [name for name in process.stdout.strip().split(",") if name]}
+        if best is None or result["best"] < best["best"]:
+            best = result
+    return best
+
+
+def check_imports(repeat=5):
+    """
+    Check the import time of every module in IMPORT_BUDGET.
+
+    :return: tuple of the result dicts and whether every module kept to its budget
+    """
+    results, ok = [], True
+    for module, budget in IMPORT_BUDGET.items():
+        result = measure_import(module, repeat)
+        passed = result["best"] * 1e3 <= budget and not result["loaded"]
+        ok &= passed
+        loaded = f", imported {', '.join(result['loaded'])}" if result["loaded"] else ""
+        print(f"{module:24s} {result['best'] * 1e3:8.1f} ms + NumPy {result['numpy'] * 1e3:.1f} ms  "
+              f"(budget {budget} ms{loaded}){'' if passed else '  FAILED'}")
+        results.append(result)
+    return results, ok
+
+
+def measure(run, min_time=0.2, repeat=5):
+    """
+    Time a benchmark like timeit: calls are grouped until a group takes at least min_time.
+
+    :return: dict with the best and median time per call [s], calls per group and groups
+    """
+    run()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    times = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        times.append((time.perf_counter() - start) / number)
+    return {"best": min(times), "median": statistics.median(times), "number": number, "repeat": repeat}
+
+
+def run_benchmarks(names=None, quick=False, min_time=0.2, repeat=5):
+    """
+    Run the benchmarks.
+
+    :param names: substrings selecting benchmarks by name, all by default
+    :param quick: only the small problem sizes
+    :return: list of result dicts
+    """
+    results = []
+    for name, (benchmark, sizes, quick_sizes) in BENCHMARKS.items():
+        if names and not any(part in name for part in names):
+            continue
+        for size in quick_sizes if quick else sizes:
+            try:
+                run = benchmark(size)
+            except ImportError as error:
+                print(f"{name:24s} {size:>9d}  skipped ({error})")
+                continue
+            try:
+                result = {"name": name, "size": size, **measure(run, min_time, repeat)}
+            finally:
+                # Benchmarks with files to remove afterwards
+                if hasattr(run, "cleanup"):
+                    run.cleanup()
+            print(f"{name:24s} {size:>9d}  {result['best'] * 1e3:12.4f} ms  (median {result['median'] * 1e3:.4f} ms)")
+            results.append(result)
+    return results
+
+
+def environment():
+    """Version information stored with the results."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(results, reference):
+    """Print the speed-up of results against an earlier run (>1 is faster)."""
+    old = {(result["name"], result["size"]): result["best"] for result in reference["results"]}
+    for result in results:
+        key = (result["name"], result["size"])
+        if key in old:
+            print(f"{result['name']:24s} {result['size']:>9d}  {old[key] / result['best']:8.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", dest="names", action="append", help="only benchmarks whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="only the small problem sizes")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum time per timing group [s]")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timing groups")
+    parser.add_argument("--output", help="JSON file for the results, benchmark_results.json or with --imports "
+                                         "import_results.json by default")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--imports", action="store_true", help="only check the import time budget")
+    args = parser.parse_args()
+
+    if args.imports:
+        # Own results file, so checking imports keeps the timings for --compare
+        results, ok = check_imports(args.repeat)
+        with open(args.output or "import_results.json", "w") as file:
+            json.dump({"environment": environment(), "results": results}, file, indent=2)
+        sys.exit(0 if ok else 1)
+
+    output = args.output or "benchmark_results.json"
+    results = run_benchmarks(args.names, args.quick, args.min_time, args.repeat)
+    with open(output, "w") as file:
+        json.dump({"environment": environment(), "results": results}, file, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            compare(results, json.load(file))
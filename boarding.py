@@ -0,0 +1,107 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from instrumentation import timed
+from units import g0, mac_fraction
+
+
+class BoardingEnvelope(NamedTuple):
+    """Cg range after each boarded passenger, over all (or all sampled) boarding orders."""
+    no_boarded: np.ndarray  # number of passengers on board, 0 to no_pass
+    weight: np.ndarray  # [N]
+    xcg_min: np.ndarray  # [-], x_cg/MAC
+    xcg_max: np.ndarray  # [-], x_cg/MAC
+    min_cg: float  # [-], over the whole boarding
+    max_cg: float  # [-], over the whole boarding
+    no_samples: int  # number of sampled boarding orders, 0 for the exact envelope
+
+
+def seat_xcg(config):
+    """
+    Location of every seat of a configuration.
+
+    :param config: LoadingConfiguration
+    :return: array of x_cg/MAC per seat, front to back [-]
+    """
+    rows_xcg = mac_fraction(np.sort(config.seat_rows), config.x_LEMAC, config.MAC)
+    return np.repeat(rows_xcg, config.seats_per_row)
+
+
+def _boarding_start(diagram):
+    """Moment [N] and weight [N] with all cargo loaded, and the weight of one passenger [N]."""
+    start = diagram.cargo["ftb"]
+    return start.moment[-1], start.weight[-1], diagram.config.passenger_mass * g0
+
+
+@timed()
+def boarding_extremes(diagram, no_pass=None):
+    """
+    Exact cg extremes over every possible seat-fill order, without enumerating the orders.
+
+    All passengers weigh the same, so after k passengers the cg only depends on the sum of the k
+    occupied seat arms. The most forward cg is reached with the k most forward seats taken and the
+    most aft cg with the k most aft seats, which follows from the sorted seat arms.
+
+    :param diagram: LoadDiagram, passengers board after all cargo is loaded
+    :param no_pass: number of passengers, all seats by default
+    :return: BoardingEnvelope
+    """
+    moment_start, weight_start, pass_weight = _boarding_start(diagram)
+    arms = seat_xcg(diagram.config)
+    no_pass = len(arms) if no_pass is None else no_pass
+    if not 0 <= no_pass <= len(arms):
+        raise ValueError("Number of passengers exceeds the number of seats")
+
+    weight = weight_start + pass_weight * np.arange(no_pass + 1)
+    front_first = np.concatenate(([0.0], np.cumsum(arms[:no_pass])))
+    aft_first = np.concatenate(([0.0], np.cumsum(arms[::-1][:no_pass])))
+    xcg_min = (moment_start + pass_weight * front_first) / weight
+    xcg_max = (moment_start + pass_weight * aft_first) / weight
+    return BoardingEnvelope(np.arange(no_pass + 1), weight, xcg_min, xcg_max, xcg_min.min(), xcg_max.max(), 0)
+
+
+@timed()
+def sample_boarding(diagram, no_samples, no_pass=None, chunk_size=20000, rng=None):
+    """
+    Monte Carlo envelope of random boarding orders, evaluated a chunk of orders at a time.
+
+    Every sample is a random permutation of the seats of which the first no_pass are filled, which
+    makes both the chosen seats and their boarding order random. Memory use is set by chunk_size,
+    so millions of samples can be drawn.
+
+    :param diagram: LoadDiagram, passengers board after all cargo is loaded
+    :param no_samples: number of random boarding orders
+    :param no_pass: number of passengers, all seats by default
+    :param chunk_size: boarding orders evaluated per NumPy pass
+    :param rng: numpy Generator or seed
+    :return: BoardingEnvelope of the sampled orders
+    """
+    rng = np.random.default_rng(rng)
+    moment_start, weight_start, pass_weight = _boarding_start(diagram)
+    arms = seat_xcg(diagram.config)
+    no_pass = len(arms) if no_pass is None else no_pass
+    if not 0 <= no_pass <= len(arms):
+        raise ValueError("Number of passengers exceeds the number of seats")
+    if no_samples < 1:
+        raise ValueError("Number of samples must be at least 1")
+
+    weight = weight_start + pass_weight * np.arange(1, no_pass + 1)
+    xcg_min = np.full(no_pass, np.inf)
+    xcg_max = np.full(no_pass, -np.inf)
+    orders = np.empty((min(chunk_size, no_samples), len(arms)))
+    done = 0
+    while done < no_samples:
+        n = min(chunk_size, no_samples - done)
+        orders[:n] = arms
+        rng.permuted(orders[:n], axis=1, out=orders[:n])
+        xcg = (moment_start + pass_weight * np.cumsum(orders[:n, :no_pass], axis=1)) / weight
+        np.minimum(xcg_min, xcg.min(axis=0), out=xcg_min)
+        np.maximum(xcg_max, xcg.max(axis=0), out=xcg_max)
+        done += n
+
+    xcg_start = moment_start / weight_start
+    xcg_min = np.concatenate(([xcg_start], xcg_min))
+    xcg_max = np.concatenate(([xcg_start], xcg_max))
+    weight = np.concatenate(([weight_start], weight))
+    return BoardingEnvelope(np.arange(no_pass + 1), weight, xcg_min, xcg_max, xcg_min.min(), xcg_max.max(), no_samples)
@@ -0,0 +1,143 @@
+import hashlib
+import os
+
+import numpy as np
+
+from instrumentation import timed
+
+refdata = 'ReferenceAircraftDataSheet.xlsx'
+
+# Location of the named parameters in the data sheet, (row, column) as used with DataFrame.iloc
+PARAMETERS = {
+    "Vh_V": (25, 11),
+    "CL_ah": (26, 11),
+    "CL_a": (27, 11),
+    "l_h": (28, 11),
+    "de_da": (29, 11),
+    "x_ac": (30, 11),
+    "MAC": (31, 11),
+}
+
+# Parsed sheets of this process, keyed by (path, mtime, size)
+_loaded = {}
+
+
+class ReferenceData:
+    """
+    Parsed reference aircraft data sheet.
+
+    Holds every cell of the sheet as a float grid (NaN where a cell is not a number) and a text grid,
+    indexed like DataFrame.iloc on pd.read_excel of the sheet. Named parameters are looked up with
+    data["CL_a"]. Loaded sheets are shared by every caller, so both grids are read-only copies.
+    """
+
+    def __init__(self, values, text):
+        """
+        :param values: 2-D float array of the cell values, NaN for text and empty cells
+        :param text: 2-D string array of the cell contents, '' for empty cells
+        """
+        values = np.array(values, dtype=float)
+        text = np.array(text, dtype=str)
+        for array in (values, text):
+            array.flags.writeable = False
+        self.values = values
+        self.text = text
+
+    def __getitem__(self, name):
+        return self.cell(*PARAMETERS[name])
+
+    def __contains__(self, name):
+        return name in PARAMETERS
+
+    def __repr__(self):
+        return f"ReferenceData({self.values.shape[0]}x{self.values.shape[1]} cells)"
+
+    def cell(self, row, column):
+        """Numeric value of a single cell."""
+        return float(self.values[row, column])
+
+    def block(self, rows, column):
+        """Numeric values of a range of rows in one column, e.g. block(slice(25, 32), 11)."""
+        return self.values[rows, column]
+
+    @property
+    def parameters(self):
+        """All named parameters as a dict."""
+        return {name: self[name] for name in PARAMETERS}
+
+
+@timed()
+def load_reference_data(filename=refdata, cache=True):
+    """
+    Load the reference aircraft data sheet, parsing the Excel file only when needed.
+
+    The parsed sheet is kept in memory for the rest of the process and, if cache is set, stored in a
+    '<filename>.cache.npz' file next to the sheet. The cache file is used as long as the sheet has
+    the same modification time and size, or otherwise the same SHA-256 hash.
+
+    :param filename: path of the Excel data sheet
+    :param cache: read and write the .npz cache file
+    :return: ReferenceData
+    """
+    stat = os.stat(filename)
+    key = (os.path.abspath(filename), stat.st_mtime_ns, stat.st_size)
+    if key in _loaded:
+        return _loaded[key]
+
+    cache_file = filename + '.cache.npz'
+    data = _read_cache(cache_file, filename, stat) if cache else None
+    if data is None:
+        data = _parse_sheet(filename)
+        if cache:
+            _write_cache(cache_file, data, stat, _file_hash(filename))
+
+    _loaded[key] = data
+    return data
+
+
+@timed("datasheet.parse_excel")
+def _parse_sheet(filename):
+    """Parse the Excel sheet with pandas into a ReferenceData."""
+    import pandas as pd
+
+    sheet = pd.read_excel(filename)
+    values = sheet.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    text = sheet.fillna('').astype(str).to_numpy().astype(str)
+    return ReferenceData(values, text)
+
+
+def _read_cache(cache_file, filename, stat):
+    """Load the cache file if it belongs to the current version of the sheet, else None."""
+    try:
+        with np.load(cache_file) as stored:
+            values, text = stored['values'], stored['text']
+            mtime_ns, size, digest = int(stored['mtime_ns']), int(stored['size']), str(stored['sha256'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+    if (mtime_ns, size) != (stat.st_mtime_ns, stat.st_size):
+        # Touched or copied sheets keep their cache as long as the contents are the same
+        if size != stat.st_size or digest != _file_hash(filename):
+            return None
+        _write_cache(cache_file, ReferenceData(values, text), stat, digest)
+    return ReferenceData(values, text)
+
+
+def _write_cache(cache_file, data, stat, digest):
+    """Store a parsed sheet, silently skipped when the directory is not writable."""
+    temporary = cache_file + '.tmp.npz'
+    try:
+        np.savez(temporary, values=data.values, text=data.text, mtime_ns=stat.st_mtime_ns, size=stat.st_size,
+                 sha256=digest)
+        os.replace(temporary, cache_file)
+    except OSError:
+        pass
+
+
+def _file_hash(filename):
+    """SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
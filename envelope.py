@@ -0,0 +1,114 @@
+import numpy as np
+
+from instrumentation import timed
+
+
+class Envelope:
+    """
+    Certified weight and cg limits as a polygon in (x_cg/MAC, weight) space.
+
+    The edge data is computed once, so checking points costs a few array operations per edge,
+    independent of how the points were computed. Distances are measured in x_cg/MAC, with weights
+    divided by weight_scale first.
+    """
+
+    __slots__ = ("xcg", "weight", "weight_scale", "_x0", "_y0", "_dx", "_dy", "_dx_dy", "_length2")
+
+    def __init__(self, xcg, weight, weight_scale=None):
+        """
+        :param xcg: x_cg/MAC of the polygon corners, in order around the polygon [-]
+        :param weight: weight of the polygon corners [N]
+        :param weight_scale: weight [N] counting as 1 x_cg/MAC in distances; by default the
+            weight range of the envelope over its cg range, so both extents count equally
+        """
+        xcg = np.array(xcg, dtype=float)
+        weight = np.array(weight, dtype=float)
+        if xcg.ndim != 1 or xcg.shape != weight.shape or len(xcg) < 3:
+            raise ValueError("Envelope needs at least three corners with an xcg and a weight each")
+        if weight_scale is None:
+            weight_scale = np.ptp(weight) / np.ptp(xcg)
+        if not weight_scale > 0:
+            raise ValueError("Weight scale must be positive")
+
+        for array in (xcg, weight):
+            array.flags.writeable = False
+        self.xcg = xcg
+        self.weight = weight
+        self.weight_scale = float(weight_scale)
+
+        # Edges from every corner to the next one, in scaled coordinates
+        y = weight / weight_scale
+        self._x0 = xcg
+        self._y0 = y
+        self._dx = np.roll(xcg, -1) - xcg
+        self._dy = np.roll(y, -1) - y
+        self._length2 = self._dx ** 2 + self._dy ** 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self._dx_dy = np.where(self._dy != 0, self._dx / self._dy, 0.0)
+
+    def __len__(self):
+        return len(self.xcg)
+
+    def __repr__(self):
+        return f"Envelope({len(self)} corners, xcg {self.xcg.min():.3f}-{self.xcg.max():.3f})"
+
+    @classmethod
+    def from_limits(cls, diagram, weight_scale=None):
+        """
+        Rectangular envelope of a load diagram: the margin cg limits between the lowest and highest
+        weight of the diagram.
+
+        :param diagram: LoadDiagram
+        :return: Envelope
+        """
+        x = (diagram.min_margin_cg, diagram.max_margin_cg)
+        w = (diagram.min_weight, diagram.max_weight)
+        return cls([x[0], x[1], x[1], x[0]], [w[0], w[0], w[1], w[1]], weight_scale)
+
+    def contains(self, xcg, weight):
+        """
+        Whether points are inside the envelope, by counting edge crossings of a ray in +xcg direction.
+
+        :param xcg: x_cg/MAC of the points, any shape [-]
+        :param weight: weight of the points, broadcasting with xcg [N]
+        :return: bool array
+        """
+        return self.check(xcg, weight, distance=False)[0]
+
+    def distance(self, xcg, weight):
+        """
+        Signed distance to the nearest limit: positive inside, negative outside [-].
+        """
+        return self.check(xcg, weight)[1]
+
+    @timed()
+    def check(self, xcg, weight, distance=True):
+        """
+        Screen points against the envelope in one pass over the edges. Points exactly on a limit
+        may count as inside or outside; their distance is 0 either way.
+
+        :param xcg: x_cg/MAC of the points, any shape [-]
+        :param weight: weight of the points, broadcasting with xcg [N]
+        :param distance: also compute the signed distance
+        :return: tuple of the inside flags and the signed distance to the nearest limit, positive
+            inside (None without distance)
+        """
+        x, y = np.broadcast_arrays(np.asarray(xcg, dtype=float), np.asarray(weight, dtype=float) / self.weight_scale)
+        inside = np.zeros(x.shape, dtype=bool)
+        nearest = np.full(x.shape, np.inf) if distance else None
+
+        for x0, y0, dx, dy, dx_dy, length2 in zip(self._x0, self._y0, self._dx, self._dy, self._dx_dy,
+                                                  self._length2):
+            # Edge crosses the horizontal line through the point, right of the point
+            crosses = (y0 > y) != (y0 + dy > y)
+            inside ^= crosses & (x < x0 + (y - y0) * dx_dy)
+            if distance:
+                px = x - x0
+                py = y - y0
+                t = np.clip((px * dx + py * dy) / length2, 0, 1) if length2 > 0 else 0.0
+                np.minimum(nearest, (px - t * dx) ** 2 + (py - t * dy) ** 2, out=nearest)
+
+        if distance:
+            nearest = np.sqrt(nearest)
+            nearest = np.where(inside, nearest, -nearest)
+        return inside, nearest
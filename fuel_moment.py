@@ -0,0 +1,115 @@
+from bisect import bisect_right
+
+import numpy as np
+
+
+class FuelMomentTable:
+    """
+    Immutable fuel moment lookup table of one aircraft, fuel load against fuel moment.
+
+    The table is built once and answers both scalar and array queries. Scalar queries use a
+    pure Python kernel (no array allocation per call), array queries go through np.interp. Both
+    give exactly the same numbers as np.interp on the raw table, multiplied by the scale.
+    """
+
+    __slots__ = ("fuel", "moment", "scale", "_fuel", "_moment", "_slopes", "_inverse_slopes")
+
+    def __init__(self, fuel, moment, scale=1):
+        """
+        :param fuel: fuel loads of the table, strictly increasing [lbs]
+        :param moment: fuel moment at each fuel load, in table units (moment / scale) [lbs-inch]
+        :param scale: factor converting the table moments to [lbs-inch], e.g. 100
+        """
+        fuel = np.array(fuel, dtype=float)
+        moment = np.array(moment, dtype=float)
+
+        if fuel.ndim != 1 or fuel.shape != moment.shape or len(fuel) < 2:
+            raise ValueError("Fuel and moment must be 1-D tables of equal length")
+        if np.any(np.diff(fuel) <= 0):
+            raise ValueError("Fuel loads must be strictly increasing")
+
+        fuel.flags.writeable = False
+        moment.flags.writeable = False
+        set_attribute = object.__setattr__
+        set_attribute(self, "fuel", fuel)
+        set_attribute(self, "moment", moment)
+        set_attribute(self, "scale", scale)
+
+        # Python copies for the scalar kernel, slopes computed the same way as np.interp
+        set_attribute(self, "_fuel", fuel.tolist())
+        set_attribute(self, "_moment", moment.tolist())
+        set_attribute(self, "_slopes", ((moment[1:] - moment[:-1]) / (fuel[1:] - fuel[:-1])).tolist())
+        if np.all(np.diff(moment) > 0):
+            set_attribute(self, "_inverse_slopes", ((fuel[1:] - fuel[:-1]) / (moment[1:] - moment[:-1])).tolist())
+        else:
+            set_attribute(self, "_inverse_slopes", None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FuelMomentTable is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("FuelMomentTable is immutable")
+
+    def __repr__(self):
+        return f"FuelMomentTable({len(self.fuel)} points, 0-{self.capacity:g} lbs)"
+
+    def __reduce__(self):
+        return FuelMomentTable, (self.fuel, self.moment, self.scale)
+
+    @property
+    def capacity(self):
+        """Largest fuel load in the table [lbs]."""
+        return self._fuel[-1]
+
+    def __call__(self, fuel_load):
+        """
+        Fuel moment for a fuel load, see moment_at.
+        """
+        return self.moment_at(fuel_load)
+
+    def moment_at(self, fuel_load):
+        """
+        Interpolate the fuel moment for a fuel load. Outside the table the end values are held.
+
+        :param fuel_load: remaining fuel, scalar or array [lbs]
+        :return: fuel moment, float or array of the same shape [lbs-inch]
+        """
+        if np.ndim(fuel_load) == 0:
+            return _interp(float(fuel_load), self._fuel, self._moment, self._slopes) * self.scale
+        return np.interp(fuel_load, self.fuel, self.moment) * self.scale
+
+    def fuel_at(self, fuel_moment):
+        """
+        Inverse lookup, the fuel load that gives a fuel moment.
+
+        :param fuel_moment: fuel moment, scalar or array [lbs-inch]
+        :return: fuel load, float or array of the same shape [lbs]
+        """
+        if self._inverse_slopes is None:
+            raise ValueError("Fuel moments are not strictly increasing, the table cannot be inverted")
+        if np.ndim(fuel_moment) == 0:
+            return _interp(float(fuel_moment) / self.scale, self._moment, self._fuel, self._inverse_slopes)
+        return np.interp(np.asarray(fuel_moment) / self.scale, self.moment, self.fuel)
+
+
+def _interp(x, xp, fp, slopes):
+    """
+    Scalar linear interpolation on Python lists, following the np.interp algorithm exactly.
+
+    :param x: query point
+    :param xp: increasing table abscissa
+    :param fp: table values
+    :param slopes: precomputed (fp[j+1] - fp[j]) / (xp[j+1] - xp[j])
+    :return: interpolated value
+    """
+    if x != x:
+        return x
+    if x >= xp[-1]:
+        return fp[-1]
+    if x < xp[0]:
+        return fp[0]
+
+    j = bisect_right(xp, x) - 1
+    if xp[j] == x:
+        return fp[j]
+    return slopes[j] * (x - xp[j]) + fp[j]
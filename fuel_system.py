@@ -0,0 +1,174 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from fuel_moment import FuelMomentTable
+from instrumentation import timed
+from mass_calculation import fuel_moment_table, x_mac, zero_fuel_mass
+from units import N_to_lbs, inch_to_m
+
+
+@dataclass(frozen=True)
+class FuelTank:
+    """Fuel tank with its own moment table."""
+    name: str
+    table: FuelMomentTable  # tank fuel load [lbs] -> moment [lbs-inch]
+
+    @property
+    def capacity(self):
+        """Largest fuel load of the tank [lbs]."""
+        return self.table.capacity
+
+
+def wing_tanks():
+    """
+    Left and right wing tank of the aircraft of mass_calculation, each half of the fuel moment
+    table. Burning both equally gives the single-table fuel moment of calculate_cg.
+
+    :return: tuple of FuelTank
+    """
+    half = FuelMomentTable(fuel_moment_table.fuel / 2, fuel_moment_table.moment / 2, fuel_moment_table.scale)
+    return FuelTank("Left wing", half), FuelTank("Right wing", half)
+
+
+class FuelSchedule:
+    """
+    Burn and transfer schedule: the fuel in every tank as a piecewise linear function of the
+    total fuel used.
+
+    The schedule is a sequence of steps, each a change of fuel per tank: negative for fuel burned
+    from or transferred out of a tank, positive for fuel transferred into it. The fuel burned in a
+    step is -sum(changes), and during the step every change is applied in proportion to the fuel
+    burned so far, so transfers run while fuel is burned and every step has to burn fuel.
+    """
+
+    __slots__ = ("initial", "breakpoints", "loads")
+
+    def __init__(self, initial, steps):
+        """
+        :param initial: fuel per tank at take-off [N]
+        :param steps: sequence of fuel changes per tank [N]
+        """
+        initial = np.array(initial, dtype=float)
+        changes = np.array(steps, dtype=float).reshape(-1, len(initial))
+        burned = -changes.sum(axis=1)
+        if np.any(initial < 0):
+            raise ValueError("Input must be positive")
+        if np.any(burned <= 0):
+            raise ValueError("Every step of a fuel schedule has to burn fuel")
+
+        loads = initial + np.concatenate((np.zeros((1, len(initial))), np.cumsum(changes, axis=0)))
+        if np.any(loads < -1e-9 * max(initial.sum(), 1)):
+            raise ValueError("Fuel schedule empties a tank below zero")
+
+        self.initial = initial
+        self.breakpoints = np.concatenate(([0.0], np.cumsum(burned)))  # fuel used at the step ends [N]
+        self.loads = np.maximum(loads, 0)  # fuel per tank at the step ends [N]
+
+    def __len__(self):
+        return len(self.breakpoints) - 1
+
+    def __repr__(self):
+        return f"FuelSchedule({len(self)} steps, {len(self.initial)} tanks, {self.breakpoints[-1]:.1f} N)"
+
+    def tank_loads(self, fuel_used):
+        """
+        Fuel per tank after an amount of fuel has been used. Beyond the end of the schedule the
+        tanks keep their final loads.
+
+        :param fuel_used: total fuel used, array [N]
+        :return: array of fuel per tank, shape (n, tanks) [N]
+        """
+        fuel_used = np.asarray(fuel_used, dtype=float)
+        return np.stack([np.interp(fuel_used, self.breakpoints, load) for load in self.loads.T], axis=-1)
+
+
+def burn_sequence(initial, order):
+    """
+    Schedule burning tank groups one after the other, every group until it is empty.
+
+    :param initial: fuel per tank at take-off [N]
+    :param order: sequence of groups of tank indices, e.g. [(2,), (0, 1)] burns tank 2 first and
+        then tanks 0 and 1 in proportion to their fuel
+    :return: FuelSchedule
+    """
+    initial = np.asarray(initial, dtype=float)
+    steps = []
+    for group in order:
+        step = np.zeros(len(initial))
+        step[list(group)] = -initial[list(group)]
+        if step.any():
+            steps.append(step)
+    return FuelSchedule(initial, steps)
+
+
+def transfer_step(no_tanks, burn, source, target, amount):
+    """
+    Schedule step that burns fuel and meanwhile transfers fuel between two tanks.
+
+    :param no_tanks: number of tanks
+    :param burn: fuel burned per tank during the step [N], dict of tank index to fuel
+    :param source: tank the transferred fuel comes from
+    :param target: tank the transferred fuel goes to
+    :param amount: fuel transferred [N]
+    :return: array of fuel changes per tank [N]
+    """
+    step = np.zeros(no_tanks)
+    for tank, fuel in burn.items():
+        step[tank] -= fuel
+    step[source] -= amount
+    step[target] += amount
+    return step
+
+
+@timed()
+def cg_trajectories(tanks, schedules, fuel_used, masses, data=None):
+    """
+    Center of gravity along the fuel used for many fuel schedules in one array computation.
+
+    The payload follows calculate_cg; the fuel moment is the sum of the tank moments, each from its
+    own table. Schedules with different numbers of steps are padded with steps that keep the loads.
+
+    :param tanks: sequence of FuelTank, in the order of the schedule tank loads
+    :param schedules: sequence of FuelSchedule
+    :param fuel_used: total fuel used along the mission, shape (n,) [N]
+    :param masses: list of payload masses [kg], or a PayloadManifest
+    :param data: list of xcg_datum of the payload masses [inch], None for a PayloadManifest
+    :return: array of xcg, aircraft's center of gravity with respect to the MAC, shape (schedules, n) [m]
+    """
+    ZFM, ZFM_moment = zero_fuel_mass(masses, data)
+    fuel_used = np.asarray(fuel_used, dtype=float)
+    if np.any(fuel_used < 0):
+        raise ValueError("Input must be positive")
+
+    # Stack the schedules, shape (S, K + 1) and (S, K + 1, tanks)
+    no_steps = max(1, max(len(schedule) for schedule in schedules))
+    breakpoints = np.empty((len(schedules), no_steps + 1))
+    loads = np.empty((len(schedules), no_steps + 1, len(tanks)))
+    for s, schedule in enumerate(schedules):
+        if schedule.loads.shape[1] != len(tanks):
+            raise ValueError("Fuel schedule does not match the number of tanks")
+        k = len(schedule) + 1
+        breakpoints[s, :k] = schedule.breakpoints
+        breakpoints[s, k:] = schedule.breakpoints[-1] + np.arange(1, no_steps + 2 - k)
+        loads[s, :k] = schedule.loads
+        loads[s, k:] = schedule.loads[-1]
+
+    # Step of every sample and the fraction of it done, shape (S, n)
+    step = np.minimum(np.count_nonzero(breakpoints[:, None, 1:-1] <= fuel_used[None, :, None], axis=-1), no_steps - 1)
+    start = np.take_along_axis(breakpoints, step, axis=1)
+    end = np.take_along_axis(breakpoints, step + 1, axis=1)
+    done = np.clip((fuel_used - start) / (end - start), 0, 1)[..., None]
+    rows = np.arange(len(schedules))[:, None]
+    tank_load = (loads[rows, step] * (1 - done) + loads[rows, step + 1] * done) * N_to_lbs  # [lbs]
+
+    for i, tank in enumerate(tanks):
+        if np.any(tank_load[..., i] > tank.capacity * (1 + 1e-9)):
+            raise ValueError(f"Fuel schedule overfills tank {tank.name!r}")
+
+    fuel_load = tank_load.sum(axis=-1)  # [lbs]
+    fuel_moment = sum(tank.table(tank_load[..., i]) for i, tank in enumerate(tanks))  # [lbs-inch]
+
+    total_mass = ZFM + fuel_load  # [lbs]
+    total_moment = ZFM_moment + fuel_moment  # [lbs-inch]
+    return (total_moment / total_mass - x_mac) * inch_to_m  # [m]
@@ -0,0 +1,111 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from envelope import Envelope
+from instrumentation import timed
+from load_diagram import compute_load_diagram
+from units import g0, mac_fraction
+
+
+class MissionProfile(NamedTuple):
+    """Time history of one mission."""
+    time: np.ndarray  # [s], shape (n,)
+    fuel_flow: np.ndarray  # [kg/s], shape (n,)
+    electric_power: np.ndarray  # [W] drawn from the batteries, shape (n,)
+    pack_fraction: np.ndarray = None  # [-], battery mass on board per battery, shape (n,) or (n, 2); None for 1
+
+
+class MissionResult(NamedTuple):
+    """Simulated missions, axes (mission, battery split, time step)."""
+    xcg: np.ndarray  # [-], x_cg/MAC
+    weight: np.ndarray  # [N]
+    fuel: np.ndarray  # [kg] on board
+    soc: np.ndarray  # [-], battery state of charge
+    within_limits: np.ndarray  # bool per mission and split, cg inside the envelope all along
+    limit_distance: np.ndarray  # [-], smallest signed distance to the envelope, negative outside
+    soc_ok: np.ndarray  # bool per mission and split, state of charge never below the minimum
+    fuel_ok: np.ndarray  # bool per mission and split, the fuel on board lasts the mission
+
+
+def _cumulative(rate, time):
+    """Trapezoidal running integral over the last axis, starting at 0."""
+    steps = (rate[..., 1:] + rate[..., :-1]) / 2 * np.diff(time, axis=-1)
+    return np.concatenate((np.zeros(steps.shape[:-1] + (1,)), np.cumsum(steps, axis=-1)), axis=-1)
+
+
+@timed()
+def simulate_missions(config, missions, forward_mass, aft_mass, payload_mass, payload_arm, fuel_mass=None,
+                      forward_arm=None, aft_arm=None, specific_energy=250 * 3600, min_soc=0.2, envelope=None):
+    """
+    Cg, weight, fuel and battery energy of many missions and battery splits in one array computation.
+
+    At take-off the fuel is reduced where needed so the aircraft stays within MTOW, as in the load
+    diagram of a battery variant. Fuel burns at the fuel tank arm; battery mass stays on board
+    unless a pack_fraction profile releases swappable packs.
+
+    :param config: LoadingConfiguration with a forward and an aft battery
+    :param missions: sequence of MissionProfile, all with the same number of time steps
+    :param forward_mass: forward battery masses to evaluate, shape (B,) [kg]
+    :param aft_mass: aft battery masses to evaluate, shape (B,) [kg]
+    :param payload_mass: payload per mission, scalar or shape (M,) [kg]
+    :param payload_arm: payload cg per mission, scalar or shape (M,) [m]
+    :param fuel_mass: fuel at take-off per mission, scalar or shape (M,) [kg]; as much as MTOW
+        allows by default
+    :param forward_arm: forward battery arms, scalar or shape (B,) [m], the configuration's by default
+    :param aft_arm: aft battery arms, scalar or shape (B,) [m], the configuration's by default
+    :param specific_energy: usable battery energy per kg [J/kg]
+    :param min_soc: lowest allowed state of charge [-]
+    :param envelope: Envelope of the cg limits, by default Envelope.from_limits of the
+        configuration's load diagram
+    :return: MissionResult
+    """
+    forward, aft = config.batteries
+    envelope = envelope or Envelope.from_limits(compute_load_diagram(config))
+
+    # Mission axis 0, battery split axis 1, time axis 2
+    time = np.stack([np.asarray(mission.time, dtype=float) for mission in missions])[:, None, :]
+    fuel_flow = np.stack([np.asarray(mission.fuel_flow, dtype=float) for mission in missions])[:, None, :]
+    power = np.stack([np.asarray(mission.electric_power, dtype=float) for mission in missions])[:, None, :]
+    packs = np.stack([np.broadcast_to(1.0 if mission.pack_fraction is None else
+                                      np.asarray(mission.pack_fraction, dtype=float).T, (2, time.shape[-1]))
+                      for mission in missions])[:, :, None, :]
+
+    forward_mass = np.asarray(forward_mass, dtype=float)[None, :, None]
+    aft_mass = np.asarray(aft_mass, dtype=float)[None, :, None]
+    forward_xcg = mac_fraction(np.asarray(forward.arm if forward_arm is None else forward_arm, dtype=float),
+                               config.x_LEMAC, config.MAC)[..., None]
+    aft_xcg = mac_fraction(np.asarray(aft.arm if aft_arm is None else aft_arm, dtype=float),
+                           config.x_LEMAC, config.MAC)[..., None]
+    payload_mass = np.broadcast_to(np.asarray(payload_mass, dtype=float), (len(missions),))[:, None, None]
+    payload_xcg = mac_fraction(np.broadcast_to(np.asarray(payload_arm, dtype=float), (len(missions),)),
+                               config.x_LEMAC, config.MAC)[:, None, None]
+
+    # Fuel at take-off, limited by MTOW, and on board along the mission [kg]
+    max_fuel = config.MTOW - config.OEW - forward_mass - aft_mass - payload_mass
+    fuel_start = max_fuel if fuel_mass is None else np.minimum(
+        np.broadcast_to(np.asarray(fuel_mass, dtype=float), (len(missions),))[:, None, None], max_fuel)
+    fuel_start = np.maximum(fuel_start, 0)
+    burned = _cumulative(fuel_flow, time)
+    fuel = np.maximum(fuel_start - burned, 0)
+
+    # Weight [N] and moment [N] (weight * x_cg/MAC)
+    forward_on_board = forward_mass * packs[:, 0]
+    aft_on_board = aft_mass * packs[:, 1]
+    fixed_moment = (config.OEW * mac_fraction(config.oew_arm, config.x_LEMAC, config.MAC)
+                    + payload_mass * payload_xcg)
+    weight = (config.OEW + payload_mass + forward_on_board + aft_on_board + fuel) * g0
+    moment = (fixed_moment + forward_on_board * forward_xcg + aft_on_board * aft_xcg
+              + fuel * mac_fraction(config.fuel_arm, config.x_LEMAC, config.MAC)) * g0
+    xcg = moment / weight
+
+    # Battery energy, against the capacity installed at take-off
+    capacity = (forward_mass + aft_mass) * specific_energy  # [J]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        soc = np.where(capacity > 0, 1 - _cumulative(power, time) / capacity, 1.0)
+    soc = np.broadcast_to(soc, xcg.shape)
+
+    inside, distance = envelope.check(xcg, weight)
+    return MissionResult(xcg, weight, np.broadcast_to(fuel, xcg.shape), soc, inside.all(axis=-1),
+                         distance.min(axis=-1), soc.min(axis=-1) >= min_soc,
+                         np.broadcast_to(burned[..., -1] <= fuel_start[..., -1], xcg.shape[:2]))
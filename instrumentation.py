@@ -0,0 +1,123 @@
+"""
+Opt-in wall time and call count instrumentation of the computation pipeline.
+
+    import instrumentation
+    instrumentation.enable()
+    ...  # run a study
+    print(instrumentation.summary())
+
+Functions are registered as stages with the timed decorator, code blocks with the stage context
+manager. Disabled (the default) a timed function costs one flag check per call and a stage
+nothing beyond entering a shared no-op context. Setting the environment variable SEAD_PROFILE=1
+enables recording at import and prints the summary when the interpreter exits. Times are
+inclusive: a stage that calls another stage also counts the time of that stage. Each process
+records its own times, so worker processes of variant_study.run_study are not included.
+"""
+import atexit
+import functools
+import os
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+
+_enabled = False
+_stats = {}  # stage name -> [calls, total time [s], longest call [s]]
+_null = nullcontext()
+
+
+def enable():
+    """Start recording."""
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """Stop recording, keeping what has been recorded."""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """Forget all recorded times."""
+    _stats.clear()
+
+
+def record(name, elapsed):
+    """Add one call of elapsed seconds to a stage."""
+    entry = _stats.get(name)
+    if entry is None:
+        _stats[name] = [1, elapsed, elapsed]
+    else:
+        entry[0] += 1
+        entry[1] += elapsed
+        if elapsed > entry[2]:
+            entry[2] = elapsed
+
+
+def timed(name=None):
+    """
+    Decorator recording the wall time of every call of a function as a stage.
+
+    :param name: stage name, '<module>.<function>' by default
+    """
+    def decorator(func):
+        stage_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(stage_name, perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def stage(name):
+    """
+    Context manager recording the wall time of a block, e.g. with stage("study.rows"): ...
+
+    :param name: stage name
+    """
+    if not _enabled:
+        return _null
+    return _timed_block(name)
+
+
+@contextmanager
+def _timed_block(name):
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        record(name, perf_counter() - start)
+
+
+def report():
+    """
+    Recorded stages, longest total time first.
+
+    :return: dict of stage name to dict with calls, total [s], mean [s] and max [s]
+    """
+    return {name: {"calls": calls, "total": total, "mean": total / calls, "max": longest}
+            for name, (calls, total, longest) in sorted(_stats.items(), key=lambda item: -item[1][1])}
+
+
+def summary():
+    """Recorded stages as a text table."""
+    lines = [f"{'stage':48s} {'calls':>9s} {'total [s]':>11s} {'mean [ms]':>11s} {'max [ms]':>11s}"]
+    for name, entry in report().items():
+        lines.append(f"{name:48s} {entry['calls']:9d} {entry['total']:11.4f} {entry['mean'] * 1e3:11.4f} "
+                     f"{entry['max'] * 1e3:11.4f}")
+    return "\n".join(lines)
+
+
+if os.environ.get("SEAD_PROFILE", "") not in ("", "0"):
+    enable()
+    atexit.register(lambda: print(summary()))
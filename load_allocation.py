@@ -0,0 +1,149 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from boarding import seat_xcg
+from instrumentation import timed
+from units import g0, mac_fraction
+
+
+class LoadAllocation(NamedTuple):
+    """Seat and cargo hold allocation of one flight."""
+    seats: np.ndarray  # indices into boarding.seat_xcg of the occupied seats, front to back
+    hold_mass: dict  # cargo hold name -> cargo mass [kg]
+    xcg: float  # [-], x_cg/MAC with the fuel on board
+    zero_fuel_xcg: float  # [-], x_cg/MAC without fuel
+    weight: float  # [N], with the fuel on board
+    feasible: bool  # both cg locations inside the margin cg limits of the load diagram
+
+
+def hold_capacity(config):
+    """
+    Cargo capacity of every hold, the cargo of the load diagram: the payload left with every seat
+    taken, split over the holds by volume.
+
+    :param config: LoadingConfiguration
+    :return: array of capacities [kg], holds ordered front to back
+    """
+    holds = sorted(config.cargo_holds, key=lambda hold: hold.arm)
+    volume = np.array([hold.volume for hold in holds])
+    return volume / volume.sum() * (config.max_payload - config.passenger_mass * config.no_pass)
+
+
+def select_seats(arms, no_pass, target):
+    """
+    Choose no_pass seats with the sum of their arms nearest a target.
+
+    Every seat set of the form 'front block, one floating seat, aft block' is considered. Moving
+    the floating seat aft one seat at a time and shifting a seat from the front to the aft block
+    when it reaches the aft block steps through sums from the no_pass most forward seats to the
+    no_pass most aft seats, each step one seat spacing. With evenly spaced seat rows every reachable
+    sum is on this chain, so the result is optimal; otherwise it is within half the largest seat
+    spacing of the optimum.
+
+    :param arms: seat arms, sorted front to back
+    :param no_pass: number of seats to take
+    :param target: wanted sum of the arms of the taken seats
+    :return: array of seat indices, front to back
+    """
+    n = len(arms)
+    if no_pass == 0:
+        return np.arange(0)
+    if no_pass == n:
+        return np.arange(n)
+
+    front = np.concatenate(([0.0], np.cumsum(arms)))  # sum of the i most forward seats
+    i = np.arange(no_pass)  # seats in the front block
+    j = no_pass - 1 - i  # seats in the aft block
+    fixed = front[i] + (front[n] - front[n - j])
+
+    # Sums with front block i run from lowest[i] to lowest[i - 1]; lowest decreases with i
+    lowest = fixed + arms[i]
+    target = min(max(target, lowest[-1]), fixed[0] + arms[n - 1 - j[0]])
+    block = int(np.count_nonzero(lowest > target))
+    aft = no_pass - 1 - block
+
+    # Floating seat between the blocks, nearest the remaining arm sum
+    remainder = target - fixed[block]
+    candidates = arms[block:n - aft]
+    k = min(int(np.searchsorted(candidates, remainder)), len(candidates) - 1)
+    if k > 0 and remainder - candidates[k - 1] < candidates[k] - remainder:
+        k -= 1
+    return np.concatenate((np.arange(block), [block + k], np.arange(n - aft, n)))
+
+
+@timed()
+def allocate_load(diagram, no_pass, cargo_mass, target_cg, fuel_mass=0, capacity=None):
+    """
+    Seat and cargo hold allocation that puts the cg nearest a target.
+
+    The target is first moved inside the margin cg limits of the load diagram, for the cg both with
+    and without fuel. The moment equations are linear: the seats are chosen with select_seats,
+    aiming for the middle of the range the cargo can still correct, and the cargo is a convex
+    combination of the front-first and the aft-first hold filling, which reaches every moment in
+    between exactly.
+
+    :param diagram: LoadDiagram of the aircraft configuration
+    :param no_pass: number of booked passengers
+    :param cargo_mass: booked cargo mass [kg]
+    :param target_cg: wanted x_cg/MAC with the fuel on board [-]
+    :param fuel_mass: fuel on board [kg], 0 to target the zero fuel cg
+    :param capacity: cargo capacity per hold, front to back [kg], hold_capacity by default
+    :return: LoadAllocation
+    """
+    config = diagram.config
+    arms = seat_xcg(config)
+    if not 0 <= no_pass <= len(arms):
+        raise ValueError("Number of passengers exceeds the number of seats")
+    if no_pass * config.passenger_mass + cargo_mass > config.max_payload:
+        raise ValueError("Payload exceeds the maximum payload")
+    holds = sorted(config.cargo_holds, key=lambda hold: hold.arm)
+    capacity = hold_capacity(config) if capacity is None else np.asarray(capacity, dtype=float)
+    if cargo_mass > capacity.sum():
+        raise ValueError("Cargo exceeds the capacity of the holds")
+
+    # Weights [N] and moments [N] (weight * x_cg/MAC) of the fixed items
+    xcg_oew, oew_weight = diagram.oew
+    pass_weight = config.passenger_mass * g0
+    fuel_weight = fuel_mass * g0
+    fuel_moment = fuel_weight * mac_fraction(config.fuel_arm, config.x_LEMAC, config.MAC)
+    zero_fuel_weight = oew_weight + no_pass * pass_weight + cargo_mass * g0
+    weight = zero_fuel_weight + fuel_weight
+
+    # Zero fuel moment for the target, moved to where both cg locations are inside the limits
+    zero_fuel_target = target_cg * weight - fuel_moment
+    lowest = max(diagram.min_margin_cg * zero_fuel_weight, diagram.min_margin_cg * weight - fuel_moment)
+    highest = min(diagram.max_margin_cg * zero_fuel_weight, diagram.max_margin_cg * weight - fuel_moment)
+    if lowest <= highest:
+        zero_fuel_target = min(max(zero_fuel_target, lowest), highest)
+    needed = zero_fuel_target - xcg_oew * oew_weight
+
+    # Cargo moment range, filling the holds front first and aft first
+    hold_xcg = mac_fraction(np.array([hold.arm for hold in holds]), config.x_LEMAC, config.MAC)
+    front_first = _fill(capacity, cargo_mass)
+    aft_first = _fill(capacity[::-1], cargo_mass)[::-1]
+    cargo_low = g0 * front_first @ hold_xcg
+    cargo_high = g0 * aft_first @ hold_xcg
+
+    # Passengers aim for the middle of what the cargo can still correct
+    pass_low = max(needed - cargo_high, pass_weight * arms[:no_pass].sum())
+    pass_high = min(needed - cargo_low, pass_weight * arms[len(arms) - no_pass:].sum())
+    seats = select_seats(arms, no_pass, (pass_low + pass_high) / 2 / pass_weight if pass_weight else 0.0)
+    pass_moment = pass_weight * arms[seats].sum()
+
+    # Cargo takes the remainder
+    span = cargo_high - cargo_low
+    t = min(max((needed - pass_moment - cargo_low) / span, 0.0), 1.0) if span > 0 else 0.0
+    hold_mass = (1 - t) * front_first + t * aft_first
+    zero_fuel_moment = xcg_oew * oew_weight + pass_moment + g0 * hold_mass @ hold_xcg
+
+    xcg = (zero_fuel_moment + fuel_moment) / weight
+    zero_fuel_xcg = zero_fuel_moment / zero_fuel_weight
+    feasible = all(diagram.min_margin_cg <= x <= diagram.max_margin_cg for x in (xcg, zero_fuel_xcg))
+    return LoadAllocation(seats, {hold.name: float(m) for hold, m in zip(holds, hold_mass)}, float(xcg),
+                          float(zero_fuel_xcg), float(weight), bool(feasible))
+
+
+def _fill(capacity, mass):
+    """Fill holds in order up to their capacity [kg]."""
+    return np.minimum(capacity, np.maximum(mass - np.concatenate(([0.0], np.cumsum(capacity)[:-1])), 0))
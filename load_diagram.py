@@ -0,0 +1,251 @@
+from dataclasses import dataclass
+from typing import NamedTuple
+
+import numpy as np
+
+from instrumentation import timed
+from units import g0, inch_to_m, mac_fraction
+
+
+@dataclass(frozen=True)
+class CargoHold:
+    """Cargo compartment, loaded in proportion to its volume."""
+    name: str
+    volume: float  # [m3]
+    arm: float  # [m]
+
+
+@dataclass(frozen=True)
+class Battery:
+    """Battery pack carried as part of the operating empty weight."""
+    name: str
+    mass: float  # [kg]
+    arm: float  # [m]
+
+
+@dataclass(frozen=True)
+class LoadingConfiguration:
+    """
+    Description of an aircraft variant for the load diagram.
+
+    All arms are measured from the fuselage datum in metres, masses are in kg. Every seat row holds
+    the seats of all seat groups; the groups are boarded one after the other (e.g. window seats
+    first, then aisle seats), each group both back to front and front to back.
+    """
+    name: str
+    x_LEMAC: float  # [m]
+    MAC: float  # [m]
+    MTOW: float  # [kg]
+    OEW: float  # [kg]
+    oew_arm: float  # [m]
+    max_payload: float  # [kg]
+    passenger_mass: float  # [kg]
+    seat_rows: tuple  # arm of every seat row [m]
+    cargo_holds: tuple  # CargoHold
+    fuel_arm: float  # [m]
+    batteries: tuple = ()  # Battery
+    seat_groups: tuple = (("Window", 2), ("Aisle", 2))  # (name, seats per row)
+    fuel_mass: float = None  # [kg], by default MTOW - OEW - batteries - max payload
+    margin: float = 0.02  # [-]
+    margin_type: str = "relative"  # "relative": cg * (1 +- margin), "mac": cg +- margin * MAC
+
+    @property
+    def seats_per_row(self):
+        return sum(seats for _, seats in self.seat_groups)
+
+    @property
+    def no_pass(self):
+        return len(self.seat_rows) * self.seats_per_row
+
+
+class LoadingCurve(NamedTuple):
+    """Loading sequence in the load diagram."""
+    xcg: np.ndarray  # [-], x_cg/MAC
+    weight: np.ndarray  # [N]
+    moment: np.ndarray  # [N], weight * x_cg/MAC
+
+
+@dataclass(frozen=True)
+class LoadDiagram:
+    """Computed load diagram of a LoadingConfiguration."""
+    config: LoadingConfiguration
+    oew: tuple  # (x_cg/MAC, weight [N]) including batteries
+    cargo: dict  # order ("btf"/"ftb") -> LoadingCurve
+    passengers: dict  # (seat group, order) -> LoadingCurve
+    fuel: LoadingCurve
+    min_cg: float  # [-]
+    max_cg: float  # [-]
+    min_margin_cg: float  # [-]
+    max_margin_cg: float  # [-]
+    min_weight: float  # [N]
+    max_weight: float  # [N]
+
+
+def cabin_rows(pass_part_start, pass_part_end, no_rows):
+    """
+    Arms of equally spaced seat rows in the passenger compartment.
+
+    :param pass_part_start: start of the passenger compartment [m]
+    :param pass_part_end: end of the passenger compartment [m]
+    :param no_rows: number of seat rows
+    :return: tuple of seat row arms, front to back [m]
+    """
+    chair_pitch = (pass_part_end - pass_part_start) / no_rows
+    return tuple(pass_part_start + (i + 0.5) * chair_pitch for i in range(no_rows))
+
+
+def crj1000():
+    """Reference CRJ1000 configuration."""
+    return LoadingConfiguration(
+        name="CRJ1000",
+        x_LEMAC=22.866,
+        MAC=3.48,
+        MTOW=41640,
+        OEW=23188,
+        oew_arm=24.258,
+        max_payload=10605,
+        passenger_mass=88,
+        seat_rows=cabin_rows(11.6846, 35.2796, 25),
+        cargo_holds=(CargoHold("Forward underfloor baggage", 5.26, 15.5026),
+                     CargoHold("Aft baggage compartment", 14.41, 26.10587)),
+        fuel_arm=24.6575,
+    )
+
+
+def crjexx():
+    """CRJEXX battery variant, the CRJ1000 with the changes 1-5 applied."""
+    forward_battery_vol = 0.934  # [m3]
+    aft_battery_vol = 1.142  # [m3]
+    forward_underfloor_baggage = 4.326  # [m3]
+
+    # Change 5: cargo holds move to make room for the batteries
+    cargo_front_arm = 15.5026 + forward_battery_vol / 2
+    cargo_aft_arm = 1.325445554 + 959.5 * inch_to_m
+
+    return LoadingConfiguration(
+        name="CRJEXX",
+        x_LEMAC=22.866,
+        MAC=3.48,
+        MTOW=41640,
+        # Change 1: lighter structure, OEW cg moved forward
+        OEW=0.95 * 22028.6,
+        oew_arm=24.258 - 0.5,
+        max_payload=10253,
+        # Change 4: two seat rows removed, (8800 - 88*8) kg over the remaining 96 seats
+        passenger_mass=(8800 - 88 * 8) / 96,
+        seat_rows=cabin_rows(11.6846, 35.2796, 25)[:24],
+        cargo_holds=(CargoHold("Forward underfloor baggage", forward_underfloor_baggage, cargo_front_arm),
+                     CargoHold("Aft baggage compartment", 14.41 - aft_battery_vol, cargo_aft_arm)),
+        fuel_arm=24.6575,
+        # Change 2: batteries in the cargo holds
+        batteries=(Battery("Forward battery", 1350,
+                           cargo_front_arm - (forward_underfloor_baggage / 4 + forward_battery_vol / 4)),
+                   Battery("Aft battery", 1650, 1096.08 * inch_to_m - aft_battery_vol / 2)),
+    )
+
+
+@timed()
+def compute_load_diagram(config):
+    """
+    Compute the loading polygons and the cg range of an aircraft configuration.
+
+    Starting from the OEW (with batteries) the cargo is added hold by hold, then the passengers
+    group by group and row by row, both back to front (btf) and front to back (ftb), and finally the
+    fuel. The cg range covers every point of these loading sequences.
+
+    :param config: LoadingConfiguration of the aircraft variant
+    :return: LoadDiagram
+    """
+    x_LEMAC = config.x_LEMAC
+    MAC = config.MAC
+
+    # Operating empty weight including batteries
+    OEW = config.OEW * g0  # [N]
+    xcg_oew = mac_fraction(config.oew_arm, x_LEMAC, MAC)
+    if config.batteries:
+        battery_weights = [battery.mass * g0 for battery in config.batteries]
+        battery_xcg = [mac_fraction(battery.arm, x_LEMAC, MAC) for battery in config.batteries]
+        xcg_oew = (xcg_oew * OEW + sum(x * w for x, w in zip(battery_xcg, battery_weights))) / (OEW + sum(battery_weights))
+        OEW = OEW + sum(battery_weights)
+
+    MaxPayload = config.max_payload * g0  # [N]
+    pass_weight = config.passenger_mass * config.no_pass * g0  # [N]
+    if pass_weight > MaxPayload:
+        raise ValueError("Passenger mass exceeds the maximum payload")
+    if config.fuel_mass is None:
+        fuel_weight = config.MTOW * g0 - OEW - MaxPayload  # [N]
+    else:
+        fuel_weight = config.fuel_mass * g0  # [N]
+
+    # Cargo, split over the holds by volume
+    cargo_not_in_cabin = sum(hold.volume for hold in config.cargo_holds)
+    holds = sorted(config.cargo_holds, key=lambda hold: hold.arm)
+    hold_weights = [(hold.volume / cargo_not_in_cabin) * (MaxPayload - pass_weight) for hold in holds]
+    hold_xcg = [mac_fraction(hold.arm, x_LEMAC, MAC) for hold in holds]
+    cargo = {
+        "btf": _loading_curve(xcg_oew * OEW, OEW, hold_xcg[::-1], hold_weights[::-1]),
+        "ftb": _loading_curve(xcg_oew * OEW, OEW, hold_xcg, hold_weights),
+    }
+
+    # Passengers, every seat group boards back to front and front to back. All groups of one
+    # boarding order form a single cumulative sum, split into one curve per group afterwards
+    rows_xcg = mac_fraction(np.sort(config.seat_rows), x_LEMAC, MAC)
+    no_rows = len(rows_xcg)
+    group_weights = np.repeat([config.passenger_mass * g0 * seats for _, seats in config.seat_groups], no_rows)
+    curves = {}
+    for order, xcg_seats in (("btf", rows_xcg[::-1]), ("ftb", rows_xcg)):
+        start = cargo[order]
+        boarding = _loading_curve(start.moment[-1], start.weight[-1], np.tile(xcg_seats, len(config.seat_groups)), group_weights)
+        for i, (group, _) in enumerate(config.seat_groups):
+            curves[(group, order)] = LoadingCurve(*(array[i * no_rows:(i + 1) * no_rows + 1] for array in boarding))
+    passengers = {(group, order): curves[(group, order)] for group, _ in config.seat_groups for order in ("btf", "ftb")}
+
+    # Fuel, added after the last passengers boarded front to back
+    last = curves[(config.seat_groups[-1][0], "ftb")] if config.seat_groups else cargo["ftb"]
+    fuel = _loading_curve(last.moment[-1], last.weight[-1], [mac_fraction(config.fuel_arm, x_LEMAC, MAC)], [fuel_weight])
+
+    # Extreme cg locations over all loading sequences
+    all_curves = list(cargo.values()) + list(passengers.values())
+    max_cg = max([xcg_oew, fuel.xcg[-1]] + [curve.xcg.max() for curve in all_curves])
+    min_cg = min([xcg_oew, fuel.xcg[-1]] + [curve.xcg.min() for curve in all_curves])
+    if config.margin_type == "relative":
+        max_margin_cg = max_cg * (1 + config.margin)
+        min_margin_cg = min_cg * (1 - config.margin)
+    elif config.margin_type == "mac":
+        max_margin_cg = max_cg + config.margin * MAC
+        min_margin_cg = min_cg - config.margin * MAC
+    else:
+        raise ValueError(f"Unknown margin type {config.margin_type!r}")
+
+    return LoadDiagram(
+        config=config,
+        oew=(xcg_oew, OEW),
+        cargo=cargo,
+        passengers=passengers,
+        fuel=fuel,
+        min_cg=min_cg,
+        max_cg=max_cg,
+        min_margin_cg=min_margin_cg,
+        max_margin_cg=max_margin_cg,
+        min_weight=OEW,
+        max_weight=fuel.weight[-1],
+    )
+
+
+def _loading_curve(moment_start, weight_start, xcg_items, weight_items):
+    """
+    Add items one by one to a loading state.
+
+    Every point follows from the cumulative sums of moments and weights, so there is no drift from
+    re-deriving each cg from the previous one.
+
+    :param moment_start: moment of the starting point [N], weight * x_cg/MAC
+    :param weight_start: weight of the starting point [N]
+    :param xcg_items: x_cg/MAC of the items in loading order [-]
+    :param weight_items: weight of the items in loading order [N]
+    :return: LoadingCurve including the starting point
+    """
+    weight_items = np.asarray(weight_items, dtype=float)
+    moment = np.cumsum(np.concatenate(([moment_start], np.asarray(xcg_items) * weight_items)))
+    weight = np.cumsum(np.concatenate(([weight_start], weight_items)))
+    return LoadingCurve(moment / weight, weight, moment)
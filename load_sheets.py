@@ -0,0 +1,99 @@
+import os
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from mass_calculation import calculate_cg_batch
+
+# Columns of a load sheet store, one .npy file each
+COLUMNS = ("fuel_used", "fuel_start", "masses", "data")
+
+
+def create_store(path, no_flights, no_items):
+    """
+    Create an empty load sheet store to be filled in place, e.g. while importing records in chunks.
+
+    A store is a directory with one .npy file per column: fuel_used and fuel_start [N] with shape
+    (no_flights,), masses [kg] and data (xcg_datum) [inch] with shape (no_flights, no_items).
+    Flights with fewer payload items leave the remaining masses at zero.
+
+    :param path: directory of the store, created if needed
+    :param no_flights: number of load sheet records
+    :param no_items: maximum number of payload items per flight
+    :return: dict of writable memory-mapped arrays per column
+    """
+    os.makedirs(path, exist_ok=True)
+    shapes = {"fuel_used": (no_flights,), "fuel_start": (no_flights,),
+              "masses": (no_flights, no_items), "data": (no_flights, no_items)}
+    store = {}
+    for column, shape in shapes.items():
+        store[column] = open_memmap(os.path.join(path, column + ".npy"), mode="w+", dtype=np.float64, shape=shape)
+        store[column][:] = 0
+    return store
+
+
+def write_store(path, fuel_used, fuel_start, masses, data):
+    """
+    Write in-memory load sheet records to a new store, see create_store.
+    """
+    masses = np.asarray(masses)
+    store = create_store(path, *masses.shape)
+    store["fuel_used"][:] = fuel_used
+    store["fuel_start"][:] = fuel_start
+    store["masses"][:] = masses
+    store["data"][:] = data
+    for array in store.values():
+        array.flush()
+
+
+def open_store(path):
+    """
+    Open a load sheet store read-only, without reading it into memory.
+
+    :return: dict of memory-mapped arrays per column
+    """
+    store = {column: np.load(os.path.join(path, column + ".npy"), mmap_mode="r") for column in COLUMNS}
+    no_flights = len(store["fuel_used"])
+    if len(store["fuel_start"]) != no_flights or store["masses"].shape != store["data"].shape or (
+            len(store["masses"]) != no_flights):
+        raise ValueError("Columns of the load sheet store have different lengths")
+    return store
+
+
+def evaluate_store(path, output="xcg.npy", chunk_size=65536, xcg_limits=None):
+    """
+    Compute xcg for every load sheet record of a store, chunk by chunk.
+
+    Records are read from the memory-mapped columns and evaluated chunk_size at a time with
+    calculate_cg_batch; the results go to a memory-mapped output file in the store, so the history
+    never has to fit in memory.
+
+    :param path: directory of the store
+    :param output: name of the xcg output file in the store
+    :param chunk_size: number of records per NumPy pass
+    :param xcg_limits: optional (forward, aft) xcg limits [m] to count exceedances against
+    :return: dict with the number of records, the xcg range [m] and, with limits, the number of
+        records forward of and aft of the limits
+    """
+    store = open_store(path)
+    no_flights = len(store["fuel_used"])
+    xcg = open_memmap(os.path.join(path, output), mode="w+", dtype=np.float64, shape=(no_flights,))
+
+    summary = {"records": no_flights, "min_xcg": np.inf, "max_xcg": -np.inf}
+    if xcg_limits is not None:
+        summary.update(forward_of_limit=0, aft_of_limit=0)
+
+    for start in range(0, no_flights, chunk_size):
+        chunk = slice(start, min(start + chunk_size, no_flights))
+        result = calculate_cg_batch(store["fuel_used"][chunk], store["fuel_start"][chunk], store["masses"][chunk],
+                                    store["data"][chunk])
+        xcg[chunk] = result
+        if len(result):
+            summary["min_xcg"] = min(summary["min_xcg"], float(result.min()))
+            summary["max_xcg"] = max(summary["max_xcg"], float(result.max()))
+        if xcg_limits is not None:
+            summary["forward_of_limit"] += int(np.count_nonzero(result < xcg_limits[0]))
+            summary["aft_of_limit"] += int(np.count_nonzero(result > xcg_limits[1]))
+
+    xcg.flush()
+    return summary
@@ -0,0 +1,161 @@
+import numpy as np
+
+from mass_calculation import BEM, BEM_moment, fuel_moment_table, x_mac
+from units import N_to_lbs, inch_to_m, kg_to_lbs, lbs_to_kg
+
+
+class LoadingState:
+    """
+    Mutable loading state of the aircraft for load planning and what-if searches.
+
+    Total payload mass and moment are kept as running sums, so adding, removing or moving a payload
+    item and changing the fuel are O(1) updates. Units follow calculate_cg: payload masses in kg,
+    arms as xcg_datum in inch, fuel in N, xcg in m with respect to the MAC. Items added in the same
+    order as the calculate_cg lists give exactly the same xcg.
+    """
+
+    def __init__(self, fuel_start, fuel_used=0):
+        """
+        :param fuel_start: total fuel weight carried at take-off [N]
+        :param fuel_used: weight of fuel used so far [N]
+        """
+        self._items = {}  # name -> (mass [lbs], arm [inch])
+        self._payload = 0  # [lbs]
+        self._payload_moment = 0  # [lbs-inch]
+        self._fuel_load = 0  # [lbs]
+        self._fuel_moment = 0  # [lbs-inch]
+        self.fuel_start = fuel_start
+        self.set_fuel_used(fuel_used)
+
+    @classmethod
+    def from_payload(cls, fuel_used, fuel_start, masses, data, names=None):
+        """
+        Loading state with the arguments of calculate_cg.
+
+        :param names: names of the payload items, their list index by default
+        """
+        state = cls(fuel_start, fuel_used)
+        for name, mass, arm in zip(range(len(masses)) if names is None else names, masses, data):
+            state.add(name, mass, arm)
+        return state
+
+    def __contains__(self, name):
+        return name in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self):
+        return f"LoadingState({len(self._items)} items, mass={self.mass:.1f} lbs, xcg={self.xcg:.4f} m)"
+
+    @property
+    def mass(self):
+        """Total mass including fuel [lbs]."""
+        return BEM + self._payload + self._fuel_load
+
+    @property
+    def moment(self):
+        """Total moment including fuel [lbs-inch]."""
+        return BEM_moment + self._payload_moment + self._fuel_moment
+
+    @property
+    def xcg(self):
+        """Aircraft's center of gravity with respect to the MAC [m]."""
+        return self._xcg(self._payload, self._payload_moment, self._fuel_load, self._fuel_moment)
+
+    def item(self, name):
+        """Mass [kg] and arm [inch] of a payload item."""
+        mass, arm = self._items[name]
+        return mass * lbs_to_kg, arm
+
+    def add(self, name, mass, arm):
+        """
+        Add a payload item.
+
+        :param name: unique name of the item, e.g. a seat or passenger
+        :param mass: mass of the item [kg]
+        :param arm: xcg_datum of the item [inch]
+        :return: change in xcg [m]
+        """
+        if name in self._items:
+            raise ValueError(f"Payload item {name!r} is already loaded")
+        if not isinstance(mass, (int, np.integer, float, np.floating)) or (
+        not isinstance(arm, (int, np.integer, float, np.floating))):
+            raise TypeError("Input is of wrong type")
+        if mass < 0 or arm < 0:
+            raise ValueError("Input must be positive")
+
+        xcg = self.xcg
+        mass = mass * kg_to_lbs  # [lbs]
+        self._items[name] = (mass, arm)
+        self._payload += mass
+        self._payload_moment = self._payload_moment + mass * arm
+        return self.xcg - xcg
+
+    def remove(self, name):
+        """
+        Remove a payload item.
+
+        :return: change in xcg [m]
+        """
+        xcg = self.xcg
+        mass, arm = self._items.pop(name)
+        self._payload -= mass
+        self._payload_moment -= mass * arm
+        return self.xcg - xcg
+
+    def move(self, name, arm):
+        """
+        Move a payload item to a new location.
+
+        :param arm: new xcg_datum of the item [inch]
+        :return: change in xcg [m]
+        """
+        if arm < 0:
+            raise ValueError("Input must be positive")
+        xcg = self.xcg
+        mass, old_arm = self._items[name]
+        self._items[name] = (mass, arm)
+        self._payload_moment += mass * (arm - old_arm)
+        return self.xcg - xcg
+
+    def set_fuel_used(self, fuel_used):
+        """
+        Set the fuel used since take-off.
+
+        :param fuel_used: weight of fuel used [N]
+        :return: change in xcg [m]
+        """
+        if fuel_used < 0 or self.fuel_start < 0:
+            raise ValueError("Input must be positive")
+        xcg = self.xcg
+        self.fuel_used = fuel_used
+        self._fuel_load = (self.fuel_start - fuel_used) * N_to_lbs  # [lbs]
+        self._fuel_moment = fuel_moment_table(self._fuel_load)  # [lbs-inch]
+        return self.xcg - xcg
+
+    def what_if_move(self, name, arm):
+        """
+        Change in xcg [m] if a payload item were moved, without changing the state.
+        """
+        mass, old_arm = self._items[name]
+        moved = self._xcg(self._payload, self._payload_moment + mass * (arm - old_arm), self._fuel_load,
+                          self._fuel_moment)
+        return moved - self.xcg
+
+    def recompute(self):
+        """
+        Rebuild the running sums from the items, removing rounding drift after many updates.
+        """
+        self._payload = 0
+        self._payload_moment = 0
+        for mass, arm in self._items.values():
+            self._payload += mass
+            self._payload_moment = self._payload_moment + mass * arm
+
+    @staticmethod
+    def _xcg(payload, payload_moment, fuel_load, fuel_moment):
+        """xcg [m] from the payload and fuel sums, in the order of calculate_cg."""
+        total_mass = BEM + payload + fuel_load  # [lbs]
+        total_moment = BEM_moment + payload_moment + fuel_moment  # [lbs-inch]
+        return (total_moment / total_mass - x_mac) * inch_to_m
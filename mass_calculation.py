@@ -1,25 +1,39 @@
+import sys
+
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
+
+from fuel_moment import FuelMomentTable
+from instrumentation import timed
+from payload_manifest import PayloadManifest
+from units import N_to_lbs, g0, inch_to_m, kg_to_lbs, lbs_to_kg, mac_fraction  # g0 and lbs_to_kg re-exported
 
 # Predetermined values for the aircraft / constants
 BEM = 9165  # [lbs]
 BEM_moment = 2672953.5  # [lbs-inch]
 x_mac = 261.45  # [inch]
-g0 = 9.80665  # [m/s**2]
-
-# Convert to imperial units
-lbs_to_kg = 0.45359237  # [-]
-inch_to_m = 0.0254  # [-]
 
-def calculate_cg(fuel_used, fuel_start, masses, data):
+# Fuel moment lookup table, fuel load [lbs] against moment [100 lbs-inch], built once per aircraft
+fuel_moment_table = FuelMomentTable(
+    np.append(np.arange(0, 5000, 100), 5008),
+    [0,298.16, 591.18, 879.08, 1165.42, 1448.4, 1732.53, 2014.8, 2298.84, 2581.92, 2866.3, 3150.18, 3434.52, 3718.52,
+     4003.23, 4287.76,
+     4572.24, 4856.56, 5141.16, 5425.64, 5709.9, 5994.04, 6278.47, 6562.82, 6846.96, 7131, 7415.33, 7699.6, 7984.34,
+     8269.06, 8554.05,
+     8839.04, 9124.8, 9410.62, 9696.97, 9983.4, 10270.08, 10556.84, 10843.87, 11131, 11418.2, 11705.5, 11993.31,
+     12281.18, 12569.04,
+     12856.86, 13144.73, 13432.48, 13720.56, 14008.46, 14320.34],
+    scale=100)
+
+
+@timed()
+def calculate_cg(fuel_used, fuel_start, masses, data=None):
     """
     Calculate the center of gravity of the aircraft based on the fuel and payload carried.
 
     :param fuel_used: weight of fuel that has been used up during flight, 0 at take-off [N]
     :param fuel_start: total fuel weight carried at take-off [N]
-    :param masses: list of payload masses [kg]
-    :param data: list of xcg_datum of the payload masses [inch]
+    :param masses: list of payload masses [kg], or a PayloadManifest
+    :param data: list of xcg_datum of the payload masses [inch], None for a PayloadManifest
     :return: xcg, aircraft's center of gravity with respect to the MAC [m]
     """
     # Check for incorrect input types. Fuel should be int or float
@@ -27,8 +41,42 @@ def calculate_cg(fuel_used, fuel_start, masses, data):
     not isinstance(fuel_start, (int, np.integer, float, np.floating))):
         raise TypeError("Input is of wrong type")
 
+    # Check for negative values
+    if fuel_used < 0 or fuel_start < 0:
+        raise ValueError("Input must be positive")
+
+    ZFM, ZFM_moment = zero_fuel_mass(masses, data)
+
+    # Calculate remaining fuel and retrieve moment from the lookup table
+    fuel_load = (fuel_start - fuel_used) * N_to_lbs  # [lbs]
+    fuel_moment = fuel_moment_table(fuel_load)  # [lbs-inch]
+
+    # Determine ramp mass
+    total_mass = ZFM + fuel_load  # [lbs]
+    total_moment = ZFM_moment + fuel_moment  # [lbs-inch]
+
+    # Find xcg_datum and xcg
+    xcg_datum = total_moment / total_mass  # [inch]
+    xcg = (xcg_datum - x_mac) * inch_to_m  # [m]
+
+    return xcg
+
+def zero_fuel_mass(masses, data):
+    """
+    Check the payload and determine the zero fuel mass and moment.
+
+    :param masses: list of payload masses [kg], or a PayloadManifest
+    :param data: list of xcg_datum of the payload masses [inch], None for a PayloadManifest
+    :return: tuple of zero fuel mass [lbs] and zero fuel moment [lbs-inch]
+    """
+    # A manifest is validated on creation and carries its totals [kg], [kg-inch]
+    if isinstance(masses, PayloadManifest) and data is None:
+        payload, payload_moment = masses.totals()
+        return BEM + payload * kg_to_lbs, BEM_moment + payload_moment * kg_to_lbs
+
     # Masses and data should be lists, arrays or Pandas series
-    if (not isinstance(masses, (list, np.ndarray, pd.Series))) or (not isinstance(data, (list, np.ndarray, pd.Series))):
+    if (not isinstance(masses, (list, np.ndarray)) and not _is_series(masses)) or (
+    not isinstance(data, (list, np.ndarray)) and not _is_series(data)):
         raise TypeError("Input is of wrong type")
 
     # Check for incorrect lists (wrong length/containing non-numbers)
@@ -39,14 +87,10 @@ def calculate_cg(fuel_used, fuel_start, masses, data):
         raise ValueError("Lists must contain numbers")
 
     # Check for negative values
-    if fuel_used < 0 or fuel_start < 0 or any(x < 0 or y < 0 for x, y in zip(masses, data)):
+    if any(x < 0 or y < 0 for x, y in zip(masses, data)):
         raise ValueError("Input must be positive")
 
-
-    
-    fuel_used = fuel_used / g0 * 1 / lbs_to_kg  # [lbs]
-    fuel_start = fuel_start / g0 * 1 / lbs_to_kg  # [lbs]
-    masses = [m * 1 / lbs_to_kg for m in masses]  # [lbs]
+    masses = [m * kg_to_lbs for m in masses]  # [lbs]
 
     # Calculate payload mass[lbs] and moment[lbs-inch]
     payload_moment = 0
@@ -55,29 +99,126 @@ def calculate_cg(fuel_used, fuel_start, masses, data):
         payload += masses[i]
         payload_moment = payload_moment + (masses[i] * data[i])
 
-    # Determine zero fuel mass and moment and moments
+    # Determine zero fuel mass and moment
     ZFM = BEM + payload  # [lbs]
     ZFM_moment = BEM_moment + payload_moment  # [lbs-inch]
+    return ZFM, ZFM_moment
+
+def cg_trajectory(fuel_used, fuel_start, masses, data=None, column=0, chunk_size=4096):
+    """
+    Stream the center of gravity along a fuel-used time series, one xcg per sample.
 
-    # Calculate remaining fuel and retrieve moment from linear lookup table relation
-    # for fuel load below 100 lbs no change in the xcg_datum is assumed
-    fuel_load = fuel_start - fuel_used  # [lbs]
-    if fuel_load < 100:
-        fuel_moment = fuel_load * 298.16
-    else:
-        fuel_moment = 100 * (2.8526 * fuel_load + 9.8957)  # [lbs-inch]
-    # Fuel moment lookup table
-    xp = np.append(np.arange(0, 5000, 100), 5008)
-    fp = np.array(
-        [0,298.16, 591.18, 879.08, 1165.42, 1448.4, 1732.53, 2014.8, 2298.84, 2581.92, 2866.3, 3150.18, 3434.52, 3718.52,
-         4003.23, 4287.76,
-         4572.24, 4856.56, 5141.16, 5425.64, 5709.9, 5994.04, 6278.47, 6562.82, 6846.96, 7131, 7415.33, 7699.6, 7984.34,
-         8269.06, 8554.05,
-         8839.04, 9124.8, 9410.62, 9696.97, 9983.4, 10270.08, 10556.84, 10843.87, 11131, 11418.2, 11705.5, 11993.31,
-         12281.18, 12569.04,
-         12856.86, 13144.73, 13432.48, 13720.56, 14008.46, 14320.34])
-
-    fuel_moment = np.interp(fuel_load, xp, fp)*100
+    The payload moment is computed once; per sample only the fuel term changes. Samples are read
+    and evaluated chunk_size at a time, so arbitrarily long logs are processed in constant memory.
+    Every xcg equals calculate_cg for the same sample.
+
+    :param fuel_used: iterable of fuel used [N]: an array, a 2-D array of log rows, a generator of
+        numbers or numeric strings, or rows of a csv.reader (see column)
+    :param fuel_start: total fuel weight carried at take-off [N]
+    :param masses: list of payload masses [kg], or a PayloadManifest
+    :param data: list of xcg_datum of the payload masses [inch], None for a PayloadManifest
+    :param column: index of the fuel used value when the samples are rows
+    :param chunk_size: number of samples evaluated per NumPy pass
+    :return: generator of xcg, aircraft's center of gravity with respect to the MAC [m]
+    """
+    for xcg in cg_trajectory_chunks(fuel_used, fuel_start, masses, data, column, chunk_size):
+        yield from xcg.tolist()
+
+def cg_trajectory_chunks(fuel_used, fuel_start, masses, data=None, column=0, chunk_size=4096):
+    """
+    Stream the center of gravity along a fuel-used time series, as arrays of up to chunk_size samples.
+
+    See cg_trajectory for the parameters.
+
+    :return: generator of arrays of xcg [m]
+    """
+    if not isinstance(fuel_start, (int, np.integer, float, np.floating)):
+        raise TypeError("Input is of wrong type")
+    if fuel_start < 0:
+        raise ValueError("Input must be positive")
+
+    ZFM, ZFM_moment = zero_fuel_mass(masses, data)
+
+    for chunk in _sample_chunks(fuel_used, column, chunk_size):
+        if np.any(chunk < 0):
+            raise ValueError("Input must be positive")
+
+        fuel_load = (fuel_start - chunk) * N_to_lbs  # [lbs]
+        fuel_moment = fuel_moment_table(fuel_load)  # [lbs-inch]
+
+        total_mass = ZFM + fuel_load  # [lbs]
+        total_moment = ZFM_moment + fuel_moment  # [lbs-inch]
+        yield (total_moment / total_mass - x_mac) * inch_to_m  # [m]
+
+def _sample_chunks(samples, column, chunk_size):
+    """
+    Read a series of samples as float arrays of up to chunk_size values.
+
+    :param samples: 1-D array or 2-D array of rows (sliced without copying), or iterable of numbers,
+        strings or rows
+    :param column: index of the value when the samples are rows
+    :param chunk_size: maximum number of values per chunk
+    :return: generator of float arrays
+    """
+    if isinstance(samples, np.ndarray):
+        if samples.ndim == 2:
+            samples = samples[:, column]
+        elif samples.ndim > 2:
+            raise ValueError("Samples must be a 1-D array or a 2-D array of rows")
+        samples = samples.reshape(-1)
+        for start in range(0, len(samples), chunk_size):
+            yield samples[start:start + chunk_size]
+        return
+
+    buffer = np.empty(chunk_size)
+    n = 0
+    for sample in samples:
+        if isinstance(sample, (list, tuple)):
+            sample = sample[column]
+        buffer[n] = float(sample)
+        n += 1
+        if n == chunk_size:
+            yield buffer.copy()
+            n = 0
+    if n:
+        yield buffer[:n].copy()
+
+@timed()
+def calculate_cg_batch(fuel_used, fuel_start, masses, data=None):
+    """
+    Calculate the center of gravity for many loading cases in one NumPy pass.
+
+    Every row of masses is one payload configuration, combined with the matching entry of
+    fuel_used and fuel_start. The arithmetic follows calculate_cg step by step, so each case
+    gives exactly the same xcg as the scalar function.
+
+    :param fuel_used: weight of fuel used per case, scalar or shape (n,) [N]
+    :param fuel_start: total fuel weight at take-off per case, scalar or shape (n,) [N]
+    :param masses: payload masses per case, shape (n, k) [kg], or a list of n PayloadManifest
+    :param data: xcg_datum of the payload masses, shape (n, k) or (k,) if shared by all cases [inch],
+        None for manifests
+    :return: array of xcg, aircraft's center of gravity with respect to the MAC, shape (n,) [m]
+    """
+    fuel_used = np.asarray(fuel_used)
+    fuel_start = np.asarray(fuel_start)
+
+    # Check for incorrect input types. Fuel should be integer or float arrays
+    if not (_is_numeric(fuel_used) and _is_numeric(fuel_start)):
+        raise TypeError("Input is of wrong type")
+
+    ZFM, ZFM_moment = _batch_zero_fuel_mass(masses, data)
+
+    # Check for incorrect fuel arrays (wrong shape/negative values)
+    if fuel_used.ndim > 1 or fuel_start.ndim > 1:
+        raise ValueError("Input arrays have the wrong dimensions")
+    if fuel_used.size not in (1, len(ZFM)) or fuel_start.size not in (1, len(ZFM)):
+        raise ValueError("Fuel arrays do not match the number of cases")
+    if np.any(fuel_used < 0) or np.any(fuel_start < 0):
+        raise ValueError("Input must be positive")
+
+    # Remaining fuel and its moment from the lookup table
+    fuel_load = (fuel_start - fuel_used) * N_to_lbs  # [lbs]
+    fuel_moment = fuel_moment_table(fuel_load)  # [lbs-inch]
 
     # Determine ramp mass
     total_mass = ZFM + fuel_load  # [lbs]
@@ -89,286 +230,107 @@ def calculate_cg(fuel_used, fuel_start, masses, data):
 
     return xcg
 
-def loaddiagram():
-    #Constants
-    xcg_datum = 3.6576 #m
-    x_LEMAC = 22.866 #m
-    MAC = 3.48 #m
-    
-    #Cargo Compartments
-    aft_bagg_comp = 14.41 #m3
-    forward_underfloor_baggage = 5.26 #m3
-    under_seat_storage = 4.16 #m3
-    overhead_bins = 5.08 #m3
-    cargo_not_in_cabin = 19.67 #m3
-    
-    #Weights
-    MTOW = 41640 * g0
-    OEW = 23188 * g0 
-    MaxPayload = 10605 * g0               #N 
-    fuel_weight = MTOW - OEW - MaxPayload            #N 
-    pass_weight = 8800 * g0            #N
-    no_pass = 100
-    no_chairsprow = 4
-    no_rows = int(no_pass / no_chairsprow)
-    front_cargo_weight = (forward_underfloor_baggage/cargo_not_in_cabin)*(MaxPayload-pass_weight)
-    aft_cargo_weight = (aft_bagg_comp/cargo_not_in_cabin)*(MaxPayload-pass_weight)     #N
-    #locations
-    pass_part_start = 11.6846 #m
-    pass_part_end = 35.2796 #m
-    
-    
-    #cg_locations
-    xcg_oew = (24.258 - x_LEMAC) / MAC
-    xcg_cargo_front = (15.5026 -  x_LEMAC) / MAC
-    xcg_cargo_aft = (26.10587 -  x_LEMAC) / MAC
-    print(xcg_cargo_front*MAC, xcg_cargo_aft*MAC)
-    xcg_fuel = (24.6575 -  x_LEMAC) / MAC
-    chair_pitch = (pass_part_end - pass_part_start) / (no_rows*MAC)
-    xcg_seats_btf = [(pass_part_end - x_LEMAC)/MAC - 0.5 * chair_pitch]
-    xcg_seats_ftb = [(pass_part_start - x_LEMAC)/MAC + 0.5 * chair_pitch]
-    for i in range(no_rows-1):
-        xcg_seats_btf.append(xcg_seats_btf[-1]-chair_pitch)
-        xcg_seats_ftb.append(xcg_seats_ftb[-1]+chair_pitch)
-    
-    print('oew:  '+ str(xcg_oew))
-    print('xcg_cargo_front:  '+str(xcg_cargo_front))
-    print('xcg_cargo_aft:  '+str(xcg_cargo_aft))
-    print('xcg_fuel:  '+str(xcg_fuel))
-    
-    #Loading functions
-    OEW_point = [xcg_oew,OEW]
-    #add cargo
-    only_aft_point = (xcg_cargo_aft*aft_cargo_weight + xcg_oew*OEW)/(OEW + aft_cargo_weight)
-    only_front_point = (xcg_cargo_front*front_cargo_weight +xcg_oew*OEW)/(OEW + front_cargo_weight)
-    both_cargo_point = (xcg_cargo_aft*aft_cargo_weight + xcg_oew*OEW + xcg_cargo_front*front_cargo_weight)/(OEW + front_cargo_weight + aft_cargo_weight)
-    cargo_points = [[OEW_point[0], only_aft_point, both_cargo_point, only_front_point, OEW_point[0]],[OEW, OEW + front_cargo_weight, OEW + front_cargo_weight + aft_cargo_weight, OEW + aft_cargo_weight,OEW]]
-    
-    #Add passengers
-    #Window
-    two_pass_weight = (pass_weight/no_pass)*2
-    
-    window_pointsbtf = [[both_cargo_point],[OEW + front_cargo_weight + aft_cargo_weight]]
-    window_pointsftb = [[both_cargo_point],[OEW + front_cargo_weight + aft_cargo_weight]]
-    for i in range(no_rows):
-        new_weight = window_pointsbtf[1][-1] + two_pass_weight
-        window_pointsbtf[0].append((window_pointsbtf[0][-1]*window_pointsbtf[1][-1] + xcg_seats_btf[i]*two_pass_weight)/new_weight)
-        window_pointsbtf[1].append(new_weight)
-        window_pointsftb[0].append((window_pointsftb[0][-1]*window_pointsftb[1][-1] + xcg_seats_ftb[i]*two_pass_weight)/new_weight)
-        window_pointsftb[1].append(new_weight)
-    #Aisle
-    aisle_pointsbtf = [[window_pointsbtf[0][-1]],[window_pointsbtf[1][-1]]]
-    aisle_pointsftb = [[window_pointsftb[0][-1]],[window_pointsbtf[1][-1]]]
-    for i in range(no_rows):
-        new_weight = aisle_pointsbtf[1][-1] + two_pass_weight
-        aisle_pointsbtf[0].append((aisle_pointsbtf[0][-1]*aisle_pointsbtf[1][-1] + xcg_seats_btf[i]*two_pass_weight)/new_weight)
-        aisle_pointsbtf[1].append(new_weight)
-        aisle_pointsftb[0].append((aisle_pointsftb[0][-1]*aisle_pointsftb[1][-1] + xcg_seats_ftb[i]*two_pass_weight)/new_weight)
-        aisle_pointsftb[1].append(new_weight)
-    
-    #Fuel
-    fuel_point = [[aisle_pointsftb[0][-1]],[aisle_pointsftb[1][-1]]]
-    fuel_point[0].append((fuel_point[0][0]*fuel_point[1][0] + xcg_fuel*fuel_weight)/(fuel_weight + fuel_point[1][0]))
-    fuel_point[1].append(fuel_weight + fuel_point[1][0])
-
-    #max values
-    allcg = [OEW_point[0], only_aft_point,only_front_point, both_cargo_point, fuel_point[0][-1]]
-    name_lst = window_pointsbtf[0], window_pointsftb[0], aisle_pointsbtf[0], aisle_pointsftb[0], 
-    for name in name_lst:
-        allcg.append(max(name))
-        allcg.append(min(name))
-    max_cg = max(allcg)
-    min_cg = min(allcg)
-    print(max_cg)
-    print(min_cg)
-    margin = 0.02
-    max_margin_cg = max_cg *(1+margin)
-    print(max_margin_cg)
-    min_margin_cg = min_cg * (1-margin)
-    print(min_margin_cg)
-    max_weight = fuel_point[1][-1]
-    min_weight = OEW
-
-    
-    #PLOTS
-
-    fig = plt.figure(figsize=(9, 7))
-    plt.scatter(xcg_oew, OEW, zorder = 6, label='OEW')
-    plt.xlabel('x_cg/MAC [-]')
-    plt.ylabel('Weight [N]')
-    plt.title('Load diagram CRJ1000')
-    plt.plot(cargo_points[0],cargo_points[1], 'r', marker = 'x', zorder = 5, label = 'Cargo')
-    plt.plot(window_pointsbtf[0],window_pointsbtf[1], 'g', marker = 'o', zorder = 4, label = 'Window passengers btf')
-    plt.plot(window_pointsftb[0],window_pointsftb[1], 'c', marker = 'D', zorder = 3, label = 'Window passengers ftb')
-    plt.plot(aisle_pointsbtf[0],aisle_pointsbtf[1], 'k', marker = 'o', zorder = 2, label = 'Aisle passengers btf')
-    plt.plot(aisle_pointsftb[0],aisle_pointsftb[1], 'm', marker = 'D', zorder = 1, label = 'Aisle passengers ftb')
-    plt.plot(fuel_point[0],fuel_point[1], 'b', marker = 'D', zorder = 0, label = 'Fuel')
-    plt.vlines(x = max_cg, ymin = 225000, ymax = 440000, zorder =0, label = 'Margin = '+ str(round((margin)*100,2))+'%'+'\nMaxCG = '+str(round(max_margin_cg,4))+'\nMinCG = '+str(round(min_margin_cg,4)))
-    plt.vlines(x = min_cg, ymin = 225000, ymax = 440000, zorder=0)
-    plt.vlines(x = max_margin_cg, ymin = 225000, ymax = 440000, zorder= 0)
-    plt.vlines(x = min_margin_cg, ymin = 225000, ymax = 440000, zorder = 0)
-    plt.xlim(0, 0.6)
-    plt.ylim(225000, 440000)
-    plt.legend(loc='upper right')
-    plt.grid()
-    plt.savefig('LoaddiagramCRJ1000.png')
-    plt.show()
-    
-def loaddiagram_crjexx():
-    #Constants
-    xcg_datum = 3.6576 #m
-    x_LEMAC = 22.866 #m
-    MAC = 3.48 #m
-    
-    #Cargo Compartments
-    aft_bagg_comp = 14.41 - 1.142 #m3
-    forward_underfloor_baggage = 4.326 #m3
-    under_seat_storage = 4.16 #m3
-    overhead_bins = 5.08 #m3
-    cargo_not_in_cabin = 17.594 #m3
-    
-    #Weights
-    MTOW = 41640 * g0
-    OEW = 22028.6 * g0    
-    MaxPayload = 10253 * g0           #N 
-    fuel_weight = MTOW - OEW - 1350*g0 - 1650*g0 - MaxPayload #N
-    pass_weight = (8800 - 88*8) * g0            #N
-    no_pass = 100
-    no_chairsprow = 4
-    no_rows = int(no_pass / no_chairsprow)
-    front_cargo_weight = (forward_underfloor_baggage/cargo_not_in_cabin)*(MaxPayload-pass_weight)
-    aft_cargo_weight = (aft_bagg_comp/cargo_not_in_cabin)*(MaxPayload-pass_weight)     #N
-    
-    #Change 2
-    forward_battery_weight = 1350 * g0    #kg
-    aft_battery_weight = 1650 * g0   #kg
-    forward_battery_vol = 0.934 #m3
-    aft_battery_vol = 1.142
-    #locations
-    pass_part_start = 11.6846 #m
-    pass_part_end = 35.2796 #m
-    
-    #Change 1
-    OEW = 0.95 * OEW  
-    
-    #cg_locations
-    xcg_oew = (24.258 - x_LEMAC) / MAC
-    #Change 1
-    xcg_oew = xcg_oew - 0.5/MAC
-    xcg_cargo_front = (15.5026 -  x_LEMAC) / MAC
-    xcg_cargo_aft = (26.10587 -  x_LEMAC) / MAC
-    #Change 5
-    xcg_cargo_front = xcg_cargo_front + forward_battery_vol/(2*MAC)
-    xcg_cargo_aft = (1.325445554 + 959.5*0.0254 - x_LEMAC)/MAC
-    xcg_bat_forward = xcg_cargo_front - (forward_underfloor_baggage/4 + forward_battery_vol/4)/MAC
-    xcg_bat_aft = (1096.08*0.0254 - aft_battery_vol/2 - x_LEMAC)/MAC
-    
-    print(xcg_bat_forward)
-    print(xcg_bat_aft)
-    #Change 5
-    xcg_fuel = (24.6575 -  x_LEMAC) / MAC
-    chair_pitch = (pass_part_end - pass_part_start) / (no_rows*MAC)
-    xcg_seats_btf = [(pass_part_end - x_LEMAC)/MAC + 0.5 * chair_pitch]
-    xcg_seats_ftb = [(pass_part_start - x_LEMAC)/MAC + 0.5 * chair_pitch]
-    for i in range(no_rows):
-        xcg_seats_btf.append(xcg_seats_btf[-1]-chair_pitch)
-        xcg_seats_ftb.append(xcg_seats_ftb[-1]+chair_pitch)
-
-    #Change 4
-    xcg_seats_btf.remove(xcg_seats_btf[0])
-    xcg_seats_btf.remove(xcg_seats_btf[0])
-    xcg_seats_ftb.remove(xcg_seats_ftb[-1])
-    xcg_seats_ftb.remove(xcg_seats_ftb[-1])
-
-    no_rows = no_rows
-
-    #add Batteries
-    xcg_oew = (xcg_oew*OEW + xcg_bat_aft*aft_battery_weight + xcg_bat_forward*forward_battery_weight)/(OEW + aft_battery_weight + forward_battery_weight)
-    OEW = OEW + aft_battery_weight + forward_battery_weight
-    fuel_weight = MTOW - OEW - MaxPayload #N
-    
-    print('oew:  '+ str(xcg_oew))
-    print('xcg_cargo_front:  '+str(xcg_cargo_front))
-    print('xcg_cargo_aft:  '+str(xcg_cargo_aft))
-    print('xcg_fuel:  '+str(xcg_fuel))
-    
-    #Loading functions
-    OEW_point = [xcg_oew,OEW]
-    #add cargo
-    only_aft_point = (xcg_cargo_aft*aft_cargo_weight + xcg_oew*OEW)/(OEW + aft_cargo_weight)
-    only_front_point = (xcg_cargo_front*front_cargo_weight +xcg_oew*OEW)/(OEW + front_cargo_weight)
-    both_cargo_point = (xcg_cargo_aft*aft_cargo_weight + xcg_oew*OEW + xcg_cargo_front*front_cargo_weight)/(OEW + front_cargo_weight + aft_cargo_weight)
-    cargo_points = [[OEW_point[0], only_aft_point, both_cargo_point, only_front_point, OEW_point[0]],[OEW, OEW + front_cargo_weight, OEW + front_cargo_weight + aft_cargo_weight, OEW + aft_cargo_weight,OEW]]
-    
-    #Add passengers
-    #Window
-    two_pass_weight = (pass_weight/(no_pass-4))*2 #change 5
-    
-    window_pointsbtf = [[both_cargo_point],[OEW + front_cargo_weight + aft_cargo_weight]]
-    window_pointsftb = [[both_cargo_point],[OEW + front_cargo_weight + aft_cargo_weight]]
-    for i in range(no_rows-1):
-        new_weight = window_pointsbtf[1][-1] + two_pass_weight
-        window_pointsbtf[0].append((window_pointsbtf[0][-1]*window_pointsbtf[1][-1] + xcg_seats_btf[i]*two_pass_weight)/new_weight)
-        window_pointsbtf[1].append(new_weight)
-        window_pointsftb[0].append((window_pointsftb[0][-1]*window_pointsftb[1][-1] + xcg_seats_ftb[i]*two_pass_weight)/new_weight)
-        window_pointsftb[1].append(new_weight)
-    #Aisle
-    aisle_pointsbtf = [[window_pointsbtf[0][-1]],[window_pointsbtf[1][-1]]]
-    aisle_pointsftb = [[window_pointsftb[0][-1]],[window_pointsbtf[1][-1]]]
-    for i in range(no_rows-1):
-        new_weight = aisle_pointsbtf[1][-1] + two_pass_weight
-        aisle_pointsbtf[0].append((aisle_pointsbtf[0][-1]*aisle_pointsbtf[1][-1] + xcg_seats_btf[i]*two_pass_weight)/new_weight)
-        aisle_pointsbtf[1].append(new_weight)
-        aisle_pointsftb[0].append((aisle_pointsftb[0][-1]*aisle_pointsftb[1][-1] + xcg_seats_ftb[i]*two_pass_weight)/new_weight)
-        aisle_pointsftb[1].append(new_weight)
-    
-    #Fuel
-    fuel_point = [[aisle_pointsftb[0][-1]],[aisle_pointsftb[1][-1]]]
-    fuel_point[0].append((fuel_point[0][0]*fuel_point[1][0] + xcg_fuel*fuel_weight)/(fuel_weight + fuel_point[1][0]))
-    fuel_point[1].append(fuel_weight + fuel_point[1][0])
-
-    #max values
-    allcg = [OEW_point[0], only_aft_point,only_front_point, both_cargo_point, fuel_point[0][-1]]
-    name_lst = window_pointsbtf[0], window_pointsftb[0], aisle_pointsbtf[0], aisle_pointsftb[0], 
-    for name in name_lst:
-        allcg.append(max(name))
-        allcg.append(min(name))
-    max_cg = max(allcg)
-    min_cg = min(allcg)
-    margin = 0.02
-    max_margin_cg = max_cg * (1+margin)
-    min_margin_cg = min_cg * (1-margin)
-    print(max_cg)
-    print(max_margin_cg)
-    print(min_cg)
-    print(min_margin_cg)
-    max_weight = fuel_point[1][-1]
-    min_weight = OEW
-    
-
-    #PLOTS
-
-    fig = plt.figure(figsize=(9, 7))
-    plt.scatter(xcg_oew, OEW, zorder = 6, label='OEW')
-    plt.xlabel('x_cg/MAC [-]')
-    plt.ylabel('Weight [N]')
-    plt.title('Load diagram CRJEXX')
-    plt.plot(cargo_points[0],cargo_points[1], 'r', marker = 'x', zorder = 5, label = 'Cargo')
-    plt.plot(window_pointsbtf[0],window_pointsbtf[1], 'g', marker = 'o', zorder = 4, label = 'Window passengers btf')
-    plt.plot(window_pointsftb[0],window_pointsftb[1], 'c', marker = 'D', zorder = 3, label = 'Window passengers ftb')
-    plt.plot(aisle_pointsbtf[0],aisle_pointsbtf[1], 'k', marker = 'o', zorder = 2, label = 'Aisle passengers btf')
-    plt.plot(aisle_pointsftb[0],aisle_pointsftb[1], 'm', marker = 'D', zorder = 1, label = 'Aisle passengers ftb')
-    plt.plot(fuel_point[0],fuel_point[1], 'b', marker = 'D', zorder = 0, label = 'Fuel')
-    plt.vlines(x = max_cg, ymin = 225000, ymax = 440000, zorder =0, label = 'Margin = '+ str(round((margin)*100,2))+'%'+'\nMaxCG = '+str(round(max_margin_cg,4))+'\nMinCG = '+str(round(min_margin_cg,4)))
-    plt.vlines(x = min_cg, ymin = 225000, ymax = 440000, zorder=0)
-    plt.vlines(x = max_margin_cg, ymin = 225000, ymax = 440000, zorder= 0)
-    plt.vlines(x = min_margin_cg, ymin = 225000, ymax = 440000, zorder = 0)
-    plt.xlim(0, 0.6)
-    plt.ylim(225000, 440000)
-    plt.legend(loc='upper right')
-    plt.grid()
-    plt.savefig('LoaddiagramCRJEXX.png')
-    plt.show()
+def _batch_zero_fuel_mass(masses, data):
+    """
+    Check the payload of many cases and determine their zero fuel mass and moment.
+
+    :param masses: payload masses per case, shape (n, k) [kg], or a list of n PayloadManifest
+    :param data: xcg_datum of the payload masses, shape (n, k) or (k,) [inch], None for manifests
+    :return: tuple of arrays of zero fuel mass [lbs] and zero fuel moment [lbs-inch], shape (n,)
+    """
+    if data is None and all(isinstance(manifest, PayloadManifest) for manifest in masses):
+        totals = np.array([manifest.totals() for manifest in masses]).reshape(-1, 2)
+        return BEM + totals[:, 0] * kg_to_lbs, BEM_moment + totals[:, 1] * kg_to_lbs
+
+    masses = np.asarray(masses)
+    data = np.asarray(data)
+
+    # Check for incorrect arrays (wrong shape/containing non-numbers)
+    if masses.ndim != 2 or data.ndim not in (1, 2):
+        raise ValueError("Input arrays have the wrong dimensions")
+    if data.shape[-1] != masses.shape[1] or (data.ndim == 2 and data.shape[0] != masses.shape[0]):
+        raise ValueError("Input lists have different lengths")
+    if not (_is_numeric(masses) and _is_numeric(data)):
+        raise ValueError("Lists must contain numbers")
+
+    # Check for negative values
+    if np.any(masses < 0) or np.any(data < 0):
+        raise ValueError("Input must be positive")
+
+    masses = masses * kg_to_lbs  # [lbs]
+    data = np.broadcast_to(data, masses.shape)
+
+    # Accumulate payload mass[lbs] and moment[lbs-inch] item by item, in the same order as
+    # calculate_cg, so the rounding of every case is identical to the scalar result
+    payload_moment = np.zeros(masses.shape[0])
+    payload = np.zeros(masses.shape[0])
+    for i in range(masses.shape[1]):
+        payload += masses[:, i]
+        payload_moment = payload_moment + (masses[:, i] * data[:, i])
+
+    # Determine zero fuel mass and moment
+    ZFM = BEM + payload  # [lbs]
+    ZFM_moment = BEM_moment + payload_moment  # [lbs-inch]
+    return ZFM, ZFM_moment
+
+def _is_numeric(array):
+    """Check whether an array holds integer or floating point numbers."""
+    return np.issubdtype(array.dtype, np.integer) or np.issubdtype(array.dtype, np.floating)
+
+def _is_series(obj):
+    """Check for a Pandas series without importing pandas, which a series implies is loaded."""
+    pd = sys.modules.get("pandas")
+    return pd is not None and isinstance(obj, pd.Series)
+
+def print_load_diagram(diagram):
+    """
+    Print the OEW cg, the locations of the cargo holds and the fuel, and the cg range of a computed
+    load diagram, all as x_cg/MAC.
+
+    :param diagram: LoadDiagram from load_diagram.compute_load_diagram
+    """
+    config = diagram.config
+    print(config.name)
+    print('oew:  ' + str(diagram.oew[0]))
+    for hold in sorted(config.cargo_holds, key=lambda hold: hold.arm):
+        print('xcg_cargo ' + hold.name + ':  ' + str(mac_fraction(hold.arm, config.x_LEMAC, config.MAC)))
+    print('xcg_fuel:  ' + str(mac_fraction(config.fuel_arm, config.x_LEMAC, config.MAC)))
+    print('max_cg:  ' + str(diagram.max_cg) + '  with margin:  ' + str(diagram.max_margin_cg))
+    print('min_cg:  ' + str(diagram.min_cg) + '  with margin:  ' + str(diagram.min_margin_cg))
+
+def loaddiagram(config=None, filename=None, show=False):
+    """
+    Compute, print and render the load diagram of the CRJ1000 (or another configuration).
+
+    Use load_diagram.compute_load_diagram directly for the numbers without any output.
+
+    :param config: LoadingConfiguration, the CRJ1000 by default
+    :param filename: file to save the plot to, 'Loaddiagram<name>.png' by default
+    :param show: open a window with the plot and block until it is closed
+    :return: LoadDiagram
+    """
+    # Imported here, so the cg functions of this module only need NumPy
+    from load_diagram import compute_load_diagram, crj1000
+    from plotting import render_load_diagram
+
+    diagram = compute_load_diagram(config or crj1000())
+    print_load_diagram(diagram)
+
+    name = diagram.config.name
+    render_load_diagram([diagram], filename or 'Loaddiagram' + name + '.png', title='Load diagram ' + name, show=show)
+    return diagram
+
+def loaddiagram_crjexx(filename=None, show=False):
+    """
+    Compute, print and render the load diagram of the CRJEXX battery variant.
+
+    :param filename: file to save the plot to, 'LoaddiagramCRJEXX.png' by default
+    :param show: open a window with the plot and block until it is closed
+    :return: LoadDiagram
+    """
+    from load_diagram import crjexx
+
+    return loaddiagram(crjexx(), filename, show)
 
 
 
@@ -391,8 +353,8 @@ if __name__ == "__main__":
 
     #xcg_measurement1 = calculate_cg(fuel_used, fuel_start, payload_masses, payload_data)
     #print(f"\nElevator Trim Curve: Measurement 1 \nx_cg is {round(xcg_measurement1, 3)} m.")
-    test = loaddiagram()
-    test2 = loaddiagram_crjexx()
+    test = loaddiagram(show=True)
+    test2 = loaddiagram_crjexx(show=True)
     # Delta xcg calculation, Steven moves between the pilots at 131:
     #   fuel_used1 = 768    # [lbs]
     #   fuel_used2 = 801    # [lbs]
@@ -0,0 +1,124 @@
+import numpy as np
+
+# Payload categories, stored as their index in the manifest
+CATEGORIES = ("crew", "passenger", "baggage", "cargo", "other")
+
+
+class PayloadManifest:
+    """
+    Payload of one flight as a struct of contiguous arrays.
+
+    Masses and arms are float64 arrays, categories int8 codes into CATEGORIES and seat ids int32
+    (-1 for items without a seat). The arrays are read-only copies of the input and the mass and
+    moment totals are computed once, so calculate_cg, calculate_cg_batch and cg_trajectory use a
+    manifest without converting or copying it.
+    """
+
+    __slots__ = ("_mass", "_arm", "_category", "_seat", "_totals")
+
+    def __init__(self, mass, arm, category=None, seat=None):
+        """
+        :param mass: payload masses [kg]
+        :param arm: xcg_datum of the payload masses [inch]
+        :param category: category per item, names from CATEGORIES or their codes, 'other' by default
+        :param seat: seat id per item, -1 for none
+        """
+        # Numbers only, as for the payload lists of calculate_cg; strings are not converted
+        mass = np.asarray(mass)
+        arm = np.asarray(arm)
+        if not (_is_numeric(mass) and _is_numeric(arm)):
+            raise ValueError("Lists must contain numbers")
+        mass = np.array(mass, dtype=np.float64)
+        arm = np.array(arm, dtype=np.float64)
+
+        if category is None:
+            category = np.full(len(mass), CATEGORIES.index("other"), dtype=np.int8)
+        elif len(category) and isinstance(category[0], str):
+            if not set(category) <= set(CATEGORIES):
+                raise ValueError(f"Unknown payload category, expected one of {CATEGORIES}")
+            category = np.array([CATEGORIES.index(name) for name in category], dtype=np.int8)
+        else:
+            category = np.asarray(category)
+            in_range = np.all((category >= 0) & (category < len(CATEGORIES)))
+            if not (np.issubdtype(category.dtype, np.integer) and in_range):
+                raise ValueError(f"Payload category codes must be integers from 0 to {len(CATEGORIES) - 1}")
+            category = np.array(category, dtype=np.int8)
+        seat = np.full(len(mass), -1, dtype=np.int32) if seat is None else np.array(seat, dtype=np.int32)
+
+        if mass.ndim != 1 or not (mass.shape == arm.shape == category.shape == seat.shape):
+            raise ValueError("Input lists have different lengths")
+        if not (np.all(np.isfinite(mass)) and np.all(np.isfinite(arm))):
+            raise ValueError("Lists must contain numbers")
+        if np.any(mass < 0) or np.any(arm < 0):
+            raise ValueError("Input must be positive")
+
+        for array in (mass, arm, category, seat):
+            array.flags.writeable = False
+        self._mass = mass
+        self._arm = arm
+        self._category = category
+        self._seat = seat
+        self._totals = None
+
+    @property
+    def mass(self):
+        """Payload masses [kg]."""
+        return self._mass
+
+    @property
+    def arm(self):
+        """xcg_datum of the payload masses [inch]."""
+        return self._arm
+
+    @property
+    def category(self):
+        """Category codes into CATEGORIES."""
+        return self._category
+
+    @property
+    def seat(self):
+        """Seat ids, -1 for none."""
+        return self._seat
+
+    def __len__(self):
+        return len(self.mass)
+
+    def __repr__(self):
+        return f"PayloadManifest({len(self)} items, {self.total_mass:.1f} kg)"
+
+    @property
+    def total_mass(self):
+        """Total payload mass [kg]."""
+        return self.totals()[0]
+
+    def totals(self):
+        """
+        Total payload mass and moment, computed on first use.
+
+        :return: tuple of mass [kg] and moment [kg-inch]
+        """
+        if self._totals is None:
+            self._totals = (float(self.mass.sum()), float(self.mass @ self.arm))
+        return self._totals
+
+    def select(self, category):
+        """
+        Items of one category.
+
+        :param category: name from CATEGORIES or its code
+        :return: PayloadManifest
+        """
+        code = CATEGORIES.index(category) if isinstance(category, str) else category
+        keep = self.category == code
+        return PayloadManifest(self.mass[keep], self.arm[keep], self.category[keep], self.seat[keep])
+
+    @classmethod
+    def concatenate(cls, manifests):
+        """Join several manifests into one."""
+        return cls(*(np.concatenate([getattr(manifest, name) for manifest in manifests])
+                     for name in ("mass", "arm", "category", "seat")))
+
+
+def _is_numeric(array):
+    """Check whether an array holds integer or floating point numbers."""
+    return np.issubdtype(array.dtype, np.integer) or np.issubdtype(array.dtype, np.floating)
@@ -0,0 +1,122 @@
+import numpy as np
+
+from instrumentation import timed
+
+# (color, marker, zorder) of the passenger loading curves
+_passenger_styles = {
+    ("Window", "btf"): ('g', 'o', 4),
+    ("Window", "ftb"): ('c', 'D', 3),
+    ("Aisle", "btf"): ('k', 'o', 2),
+    ("Aisle", "ftb"): ('m', 'D', 1),
+}
+
+
+def _figure(show, **kwargs):
+    """
+    Create a figure with one axes, importing matplotlib on first use. A figure that is not shown is
+    rendered off-screen with the Agg canvas, without pyplot, so it works on headless machines and
+    leaves the pyplot backend of the process alone.
+
+    :param show: create the figure with pyplot, to be shown in a window
+    :param kwargs: arguments of the figure, e.g. figsize
+    :return: tuple of figure and axes
+    """
+    if show:
+        import matplotlib.pyplot as plt
+        return plt.subplots(**kwargs)
+
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    fig = Figure(**kwargs)
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot()
+
+
+def _finish(fig, filename, show):
+    """Save and/or show a figure."""
+    if filename is not None:
+        fig.savefig(filename)
+    if show:
+        import matplotlib.pyplot as plt
+        plt.show()
+
+
+def plot_load_diagram(ax, diagram):
+    """
+    Draw a computed load diagram on a matplotlib axes.
+
+    :param ax: matplotlib axes
+    :param diagram: LoadDiagram from load_diagram.compute_load_diagram
+    """
+    config = diagram.config
+    margin = config.margin
+    cargo_xcg = np.concatenate([diagram.cargo["btf"].xcg, diagram.cargo["ftb"].xcg[-2::-1]])
+    cargo_weight = np.concatenate([diagram.cargo["btf"].weight, diagram.cargo["ftb"].weight[-2::-1]])
+
+    if config.margin_type == "mac":
+        margin_label = 'Margin = ' + str(round(margin * 100, 2)) + '% or ' + str(round(margin * config.MAC * 100, 4)) + ' [cm]'
+    else:
+        margin_label = 'Margin = ' + str(round(margin * 100, 2)) + '%'
+    margin_label += '\nMaxCG = ' + str(round(diagram.max_margin_cg, 4)) + '\nMinCG = ' + str(round(diagram.min_margin_cg, 4))
+
+    ax.scatter(diagram.oew[0], diagram.oew[1], zorder = 6, label='OEW')
+    ax.plot(cargo_xcg, cargo_weight, 'r', marker = 'x', zorder = 5, label = 'Cargo')
+    for (group, order), curve in diagram.passengers.items():
+        color, marker, zorder = _passenger_styles.get((group, order), (None, 'o', 1))
+        ax.plot(curve.xcg, curve.weight, color, marker = marker, zorder = zorder, label = group + ' passengers ' + order)
+    ax.plot(diagram.fuel.xcg, diagram.fuel.weight, 'b', marker = 'D', zorder = 0, label = 'Fuel')
+    ax.vlines(x = diagram.max_cg, ymin = 225000, ymax = 440000, zorder = 0, label = margin_label)
+    ax.vlines(x = diagram.min_cg, ymin = 225000, ymax = 440000, zorder = 0)
+    ax.vlines(x = diagram.max_margin_cg, ymin = 225000, ymax = 440000, zorder = 0)
+    ax.vlines(x = diagram.min_margin_cg, ymin = 225000, ymax = 440000, zorder = 0)
+
+
+@timed()
+def render_load_diagram(diagrams, filename=None, title='Load diagram', xlim=(0, 0.6), legend=True, show=False):
+    """
+    Render one or more computed load diagrams in a single figure.
+
+    :param diagrams: list of LoadDiagram
+    :param filename: file to save the figure to, not saved if None
+    :param title: figure title
+    :param xlim: x_cg/MAC range of the plot [-]
+    :param legend: draw the legend
+    :param show: open a window and block until it is closed
+    :return: matplotlib figure
+    """
+    fig, ax = _figure(show, figsize=(9, 7))
+    for diagram in diagrams:
+        plot_load_diagram(ax, diagram)
+    ax.set_xlabel('x_cg/MAC [-]')
+    ax.set_ylabel('Weight [N]')
+    ax.set_title(title)
+    ax.set_xlim(*xlim)
+    ax.set_ylim(225000, 440000)
+    if legend:
+        ax.legend(loc='upper right')
+    ax.grid()
+    _finish(fig, filename, show)
+    return fig
+
+
+@timed()
+def render_scissor(lines, filename=None, show=False):
+    """
+    Render the stability and controllability lines of a scissor plot.
+
+    :param lines: ScissorLines from scissor_plot.scissor_lines
+    :param filename: file to save the figure to, not saved if None
+    :param show: open a window and block until it is closed
+    :return: matplotlib figure
+    """
+    fig, ax = _figure(show)
+    ax.plot(lines.x_np, lines.Sh_S, color='b', label='Stability')
+    ax.plot(lines.x_cg, lines.Sh_S, color='orange', label='Stability with safety margin')
+    ax.plot(lines.x_cg_control, lines.Sh_S, color='green', label='controllability')
+    ax.set_xlim(left=0.0)
+    ax.set_xlim(right=1.0)
+    ax.legend()
+    ax.set_xlabel("X_cg/MAC")
+    ax.set_ylabel("Sh/S")
+    _finish(fig, filename, show)
+    return fig
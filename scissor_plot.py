@@ -1,31 +1,166 @@
-import pandas as pd
+from typing import NamedTuple
+
 import numpy as np
-import matplotlib.pyplot as plt
 
+from datasheet import load_reference_data
+from instrumentation import timed
+from plotting import render_scissor
+
+
+class ScissorLines(NamedTuple):
+    """Stability and controllability lines of a scissor plot."""
+    Sh_S: np.ndarray  # [-]
+    x_np: np.ndarray  # [-], neutral point x/MAC
+    x_cg: np.ndarray  # [-], most aft cg x/MAC with stability margin
+    x_cg_control: np.ndarray  # [-], most forward cg x/MAC for controllability
+
+
+class TailSizing(NamedTuple):
+    """Minimum tail area ratios of a scissor sweep."""
+    Sh_S: np.ndarray  # [-], minimum feasible Sh/S, NaN where no tail size satisfies both lines
+    Sh_S_stability: np.ndarray  # [-], Sh/S where the stability line passes the most aft cg
+    Sh_S_control: np.ndarray  # [-], Sh/S where the controllability line passes the most forward cg
+    feasible: np.ndarray  # bool
 
+
+class WingPlacement(NamedTuple):
+    """Smallest tail with the matching wing position."""
+    Sh_S: np.ndarray  # [-], minimum Sh/S
+    LEMAC_shift: np.ndarray  # [m], move of the leading edge of the MAC, positive aft
+    cg_min: np.ndarray  # [-], most forward cg x/MAC after the shift
+    cg_max: np.ndarray  # [-], most aft cg x/MAC after the shift
+
+
+@timed()
 def read_data(refdata):
-    data = pd.read_excel(refdata)
-    dimensions = data.iloc[25:32, 11]
-    return dimensions
+    """
+    Read the scissor plot parameters from the reference aircraft data sheet.
+
+    :param refdata: path of the Excel data sheet
+    :return: dict of the parameters Vh_V, CL_ah, CL_a, l_h, de_da, x_ac and MAC
+    """
+    return load_reference_data(refdata).parameters
 
 
-def plot_scissor(x_ac, CL_ah, CL_a, de_da, l_h, MAC, Vh_V, SM, CL_h, Cmac, CL_w):
-    Sh_S = np.linspace(0, 0.8, 1000)
+@timed()
+def scissor_lines(x_ac, CL_ah, CL_a, de_da, l_h, MAC, Vh_V, SM, CL_h, Cmac, CL_w, Sh_S=None):
+    """
+    Compute the stability and controllability lines of the scissor plot, without plotting.
+
+    :param Sh_S: tail area ratios to evaluate the lines at, 1000 points from 0 to 0.8 by default
+    :return: ScissorLines
+    """
+    if Sh_S is None:
+        Sh_S = np.linspace(0, 0.8, 1000)
     x_np = CL_ah / CL_a * (1-de_da) * l_h/MAC * Vh_V**2 * Sh_S + x_ac
     x_cg = x_np - SM
     x_cg_control = CL_h / CL_w * (1-de_da) * l_h/MAC * Vh_V**2 * Sh_S + x_ac - Cmac/CL_w
+    return ScissorLines(Sh_S, x_np, x_cg, x_cg_control)
+
+
+def scissor_slopes(CL_ah, CL_a, de_da, l_h, MAC, Vh_V, CL_h, CL_w):
+    """
+    Slopes d(x/MAC)/d(Sh/S) of the stability and controllability lines. Arguments broadcast.
+
+    :return: tuple (stability slope, controllability slope) [-]
+    """
+    tail = (1-de_da) * l_h/MAC * Vh_V**2
+    return CL_ah / CL_a * tail, CL_h / CL_w * tail
+
+
+@timed()
+def scissor_sweep(x_ac, CL_ah, CL_a, de_da, l_h, MAC, Vh_V, SM, CL_h, Cmac, CL_w, cg_min, cg_max):
+    """
+    Minimum tail area ratio for a cg range, solved analytically for whole parameter grids.
+
+    All arguments broadcast against each other like NumPy arrays, so e.g. SM[:, None] and
+    CL_h[None, :] sweep a 2-D grid. The stability line (with margin SM) has to lie aft of cg_max and
+    the controllability line forward of cg_min; both are straight lines in Sh/S, so the smallest
+    Sh/S meeting both follows from their intersections with the cg limits.
+
+    :param cg_min: most forward cg of the loading envelope [-], x/MAC
+    :param cg_max: most aft cg of the loading envelope [-], x/MAC
+    :return: TailSizing
+    """
+    stability_slope, control_slope = scissor_slopes(CL_ah, CL_a, de_da, l_h, MAC, Vh_V, CL_h, CL_w)
+
+    # Both requirements written as slope * Sh_S >= rhs
+    stability_rhs = cg_max - x_ac + SM
+    control_rhs = x_ac - Cmac/CL_w - cg_min
+    control_slope = -control_slope
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Sh_S_stability = np.asarray(stability_rhs / stability_slope, dtype=float)
+        Sh_S_control = np.asarray(control_rhs / control_slope, dtype=float)
+
+    lower = np.zeros(np.broadcast(Sh_S_stability, Sh_S_control).shape)
+    upper = np.full(lower.shape, np.inf)
+    feasible = np.ones(lower.shape, dtype=bool)
+    for slope, rhs, Sh_S_line in ((stability_slope, stability_rhs, Sh_S_stability),
+                                  (control_slope, control_rhs, Sh_S_control)):
+        # A positive slope gives a lower bound on Sh/S, a negative slope an upper bound
+        lower = np.where(slope > 0, np.maximum(lower, Sh_S_line), lower)
+        upper = np.where(slope < 0, np.minimum(upper, Sh_S_line), upper)
+        feasible &= (slope != 0) | (rhs <= 0)
+
+    feasible &= lower <= upper
+    return TailSizing(np.where(feasible, lower, np.nan), Sh_S_stability, Sh_S_control, feasible)
+
+
+@timed()
+def minimum_tail_area(x_ac, CL_ah, CL_a, de_da, l_h, MAC, Vh_V, SM, CL_h, Cmac, CL_w, cg_min, cg_max):
+    """
+    Smallest Sh/S over all wing positions, with the wing position that achieves it, in closed form.
+
+    Moving the wing aft by LEMAC_shift moves the fuselage-fixed cg range forward by LEMAC_shift/MAC,
+    while x_ac (relative to the MAC) stays put; l_h is taken as fixed. Adding up the stability and
+    controllability requirements removes the shift, which gives
+    Sh/S = (cg_max - cg_min + SM - Cmac/CL_w) / (stability slope - controllability slope).
+    All arguments broadcast like NumPy arrays.
+
+    :param cg_min: most forward cg of the loading envelope at the current wing position [-], x/MAC
+    :param cg_max: most aft cg of the loading envelope at the current wing position [-], x/MAC
+    :return: WingPlacement, NaN where the controllability line does not slope forward
+    """
+    stability_slope, control_slope = scissor_slopes(CL_ah, CL_a, de_da, l_h, MAC, Vh_V, CL_h, CL_w)
+    valid = (stability_slope > 0) & (control_slope < 0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Sh_S = (cg_max - cg_min + SM - Cmac/CL_w) / (stability_slope - control_slope)
+        Sh_S = np.where(valid, np.maximum(Sh_S, 0), np.nan)
+
+        # Shift that puts the most aft cg on the stability line; with Sh/S = 0 there is a whole
+        # range of valid positions, of which the middle is taken
+        shift_stability = cg_max - x_ac + SM - stability_slope * Sh_S
+        shift_control = cg_min - x_ac + Cmac/CL_w - control_slope * Sh_S
+        shift = (shift_stability + shift_control) / 2
+
+    return WingPlacement(Sh_S, shift * MAC, cg_min - shift, cg_max - shift)
+
+
+@timed()
+def size_tail(diagram, x_ac, CL_ah, CL_a, de_da, l_h, Vh_V, SM, CL_h, Cmac, CL_w):
+    """
+    Minimum tail area and wing position for the cg range of a load diagram, margins included.
+
+    :param diagram: LoadDiagram from load_diagram.compute_load_diagram
+    :return: WingPlacement, see minimum_tail_area
+    """
+    return minimum_tail_area(x_ac, CL_ah, CL_a, de_da, l_h, diagram.config.MAC, Vh_V, SM, CL_h, Cmac, CL_w,
+                             diagram.min_margin_cg, diagram.max_margin_cg)
+
+
+def plot_scissor(x_ac, CL_ah, CL_a, de_da, l_h, MAC, Vh_V, SM, CL_h, Cmac, CL_w, filename="ScissorPlot", show=False):
+    """
+    Compute the scissor plot lines and render them, see scissor_lines.
 
-    plt.figure(1)
-    plt.plot(x_np, Sh_S, color='b', label='Stability')
-    plt.plot(x_cg, Sh_S, color='orange', label='Stability with safety margin')
-    plt.plot(x_cg_control, Sh_S, color='green', label='controllability')
-    plt.xlim(left=0.0)
-    plt.xlim(right=1.0)
-    plt.legend()
-    plt.xlabel("X_cg/MAC")
-    plt.ylabel("Sh/S")
-    plt.savefig("ScissorPlot")
-    plt.show()
+    :param filename: file to save the plot to, not saved if None
+    :param show: open a window with the plot and block until it is closed
+    :return: ScissorLines
+    """
+    lines = scissor_lines(x_ac, CL_ah, CL_a, de_da, l_h, MAC, Vh_V, SM, CL_h, Cmac, CL_w)
+    render_scissor(lines, filename, show)
+    return lines
 
 
 if __name__ == "__main__":
@@ -34,16 +169,16 @@ if __name__ == "__main__":
 
     data = read_data(refdata)
     print(data)
-    Vh_V = data.iloc[0]
-    CL_ah = data.iloc[1]
-    CL_a = data.iloc[2]
-    lh = data.iloc[3]
-    de_da = data.iloc[4]
-    x_ac = data.iloc[5]
-    MAC = data.iloc[6]
+    Vh_V = data["Vh_V"]
+    CL_ah = data["CL_ah"]
+    CL_a = data["CL_a"]
+    lh = data["l_h"]
+    de_da = data["de_da"]
+    x_ac = data["x_ac"]
+    MAC = data["MAC"]
 
     CL_w = 1.47
     CL_h = -0.8
     Cmac = -0.273610357
 
-    plot_scissor(x_ac, CL_ah, CL_a, de_da, lh, MAC, Vh_V, SM, CL_h, Cmac, CL_w)
\ No newline at end of file
+    plot_scissor(x_ac, CL_ah, CL_a, de_da, lh, MAC, Vh_V, SM, CL_h, Cmac, CL_w, show=True)
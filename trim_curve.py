@@ -0,0 +1,163 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from atmosphere import Ws, reduce_airspeed, rho0
+from instrumentation import timed
+from mass_calculation import BEM, calculate_cg_batch
+from units import deg_to_rad, ft_to_m, g0, kts_to_ms, lbs_to_kg
+
+# Rows of the elevator trim curve and cg shift measurements in the data sheet, and the columns of
+# hp [ft], IAS [kts], alpha [deg], delta_e [deg], fuel used [lbs] and TAT [deg C], as used with
+# DataFrame.iloc. The defaults assume the layout of the standard post-flight data sheet; empty or
+# text cells raise an error, so a sheet with another layout is not reduced silently.
+TRIM_ROWS = slice(57, 64)
+SHIFT_ROWS = slice(73, 75)
+MEASUREMENT_COLUMNS = {"hp": 3, "V_c": 4, "alpha": 5, "delta_e": 6, "fuel_used": 11, "TAT": 12}
+
+
+class TrimSeries(NamedTuple):
+    """Stationary measurements of one or more flights, in SI units."""
+    hp: np.ndarray  # [m], pressure altitude
+    V_c: np.ndarray  # [m/s], calibrated airspeed
+    alpha: np.ndarray  # [rad]
+    delta_e: np.ndarray  # [rad], elevator deflection
+    TAT: np.ndarray  # [K], total air temperature
+    fuel_used: np.ndarray  # [N]
+    flight: np.ndarray  # flight index per point, 0 to number of flights - 1
+
+
+class TrimCurve(NamedTuple):
+    """Reduced elevator trim curve and the longitudinal stability derivatives."""
+    xcg: np.ndarray  # [m] per point, with respect to the MAC
+    W: np.ndarray  # [N] per point
+    V_e_reduced: np.ndarray  # [m/s] per point, equivalent airspeed at the standard weight
+    ddelta_e_dalpha: np.ndarray  # [-] per flight, slope of delta_e against alpha
+    trim_intercept: np.ndarray  # [rad] per flight, delta_e = trim_intercept + trim_slope / V_e_reduced**2
+    trim_slope: np.ndarray  # [rad m^2/s^2] per flight
+    Cm_delta: np.ndarray  # [1/rad] per flight, elevator effectiveness
+    Cm_alpha: np.ndarray  # [1/rad] per flight, longitudinal stability
+
+
+def read_trim_series(data, rows=TRIM_ROWS, columns=MEASUREMENT_COLUMNS, flight=None):
+    """
+    Measurement series from the data sheet, converted to SI units. Calibrated airspeed is taken
+    equal to the indicated airspeed.
+
+    :param data: ReferenceData from datasheet.load_reference_data
+    :param rows: rows of the measurements
+    :param columns: column of every TrimSeries field except flight
+    :param flight: flight index per point, all 0 by default
+    :return: TrimSeries
+    """
+    def column(name):
+        values = data.block(rows, columns[name])
+        if not np.all(np.isfinite(values)):
+            raise ValueError(f"Data sheet column {columns[name]} of {name!r} contains cells that are not numbers")
+        return values
+
+    hp = column("hp") * ft_to_m
+    flight = np.zeros(len(hp), dtype=np.intp) if flight is None else np.asarray(flight, dtype=np.intp)
+    return TrimSeries(hp, column("V_c") * kts_to_ms, column("alpha") * deg_to_rad, column("delta_e") * deg_to_rad,
+                      column("TAT") + 273.15, column("fuel_used") * lbs_to_kg * g0, flight)
+
+
+def grouped_linear_fit(x, y, groups, no_groups=None):
+    """
+    Least squares straight line y = intercept + slope * x through every group of points at once.
+
+    :param x: array of x values
+    :param y: array of y values
+    :param groups: group index per point
+    :param no_groups: number of groups, max(groups) + 1 by default
+    :return: tuple of intercept and slope arrays, one value per group
+    """
+    groups = np.asarray(groups, dtype=np.intp)
+    no_groups = no_groups or int(groups.max()) + 1
+    n = np.bincount(groups, minlength=no_groups)
+    mean_x = np.bincount(groups, x, no_groups) / n
+    mean_y = np.bincount(groups, y, no_groups) / n
+
+    # Centered sums, so the fit stays accurate for x far from 0
+    dx = x - mean_x[groups]
+    slope = np.bincount(groups, dx * (y - mean_y[groups]), no_groups) / np.bincount(groups, dx * dx, no_groups)
+    return mean_y - slope * mean_x, slope
+
+
+def _broadcast_payload(masses, data, no_points):
+    """Payload masses [kg] and data [inch] as (no_points, k) arrays."""
+    masses = np.asarray(masses, dtype=float)
+    return np.broadcast_to(masses, (no_points, masses.shape[-1])), np.asarray(data, dtype=float)
+
+
+def _weight(fuel_used, fuel_start, masses):
+    """Aircraft weight [N] per point."""
+    return (BEM * lbs_to_kg + masses.sum(axis=1)) * g0 + fuel_start - fuel_used
+
+
+def elevator_effectiveness(shift, fuel_start, masses, data, S, MAC):
+    """
+    Elevator effectiveness from cg shift measurements.
+
+    Every flight has two consecutive points, before and after a payload item is moved;
+    Cm_delta = -1 / (delta_e2 - delta_e1) * CN * (xcg2 - xcg1) / MAC with CN from the mean of the
+    two points.
+
+    :param shift: TrimSeries with two points per flight, ordered by flight
+    :param fuel_start: fuel weight at take-off, scalar or per point [N]
+    :param masses: payload masses, (k,) or per point (2 * flights, k) [kg]
+    :param data: xcg_datum of the payload per point, (2 * flights, k) [inch]
+    :param S: wing area [m^2]
+    :param MAC: mean aerodynamic chord [m]
+    :return: array of Cm_delta per flight [1/rad]
+    """
+    masses, data = _broadcast_payload(masses, data, len(shift.fuel_used))
+    xcg = calculate_cg_batch(shift.fuel_used, fuel_start, masses, data).reshape(-1, 2)
+    W = _weight(shift.fuel_used, fuel_start, masses)
+    V_e = reduce_airspeed(shift.hp, shift.V_c, shift.TAT, W).V_e
+
+    CN = (W / (0.5 * rho0 * V_e * V_e * S)).reshape(-1, 2).mean(axis=1)
+    delta_e = np.asarray(shift.delta_e).reshape(-1, 2)
+    return -CN * (xcg[:, 1] - xcg[:, 0]) / MAC / (delta_e[:, 1] - delta_e[:, 0])
+
+
+@timed()
+def elevator_trim_curve(trim, shift, fuel_start, masses, data, shift_data, S, MAC, Ws=Ws):
+    """
+    Reduce the elevator trim curve measurements of a whole campaign in one pass.
+
+    The cg of every point follows from calculate_cg_batch, the airspeeds are reduced to standard
+    conditions and the standard weight, and straight lines are fitted per flight: delta_e against
+    alpha and delta_e against 1 / V_e_reduced**2. The thrust correction of delta_e is not applied.
+
+    :param trim: TrimSeries of the trim curve points
+    :param shift: TrimSeries of the cg shift points, two per flight
+    :param fuel_start: fuel weight at take-off, scalar or per point [N]
+    :param masses: payload masses, (k,) or per point [kg]; trim and shift points in that order
+    :param data: xcg_datum of the payload of the trim points, (k,) or per point [inch]
+    :param shift_data: xcg_datum of the payload of the shift points, per point [inch]
+    :param S: wing area [m^2]
+    :param MAC: mean aerodynamic chord [m]
+    :param Ws: standard aircraft weight [N]
+    :return: TrimCurve
+    """
+    no_points = len(trim.fuel_used)
+    masses = np.asarray(masses, dtype=float)
+    trim_masses = masses[:no_points] if masses.ndim == 2 else masses
+    shift_masses = masses[no_points:] if masses.ndim == 2 else masses
+    fuel_start = np.asarray(fuel_start, dtype=float)
+    trim_fuel_start = fuel_start[:no_points] if fuel_start.ndim else fuel_start
+    shift_fuel_start = fuel_start[no_points:] if fuel_start.ndim else fuel_start
+
+    trim_masses, data = _broadcast_payload(trim_masses, data, no_points)
+    xcg = calculate_cg_batch(trim.fuel_used, trim_fuel_start, trim_masses, data)
+    W = _weight(trim.fuel_used, trim_fuel_start, trim_masses)
+    V_e_reduced = reduce_airspeed(trim.hp, trim.V_c, trim.TAT, W, Ws).V_e_reduced
+
+    no_flights = int(trim.flight.max()) + 1
+    ddelta_e_dalpha = grouped_linear_fit(trim.alpha, trim.delta_e, trim.flight, no_flights)[1]
+    trim_intercept, trim_slope = grouped_linear_fit(1 / (V_e_reduced * V_e_reduced), trim.delta_e, trim.flight,
+                                                    no_flights)
+    Cm_delta = elevator_effectiveness(shift, shift_fuel_start, shift_masses, shift_data, S, MAC)
+    return TrimCurve(xcg, W, V_e_reduced, ddelta_e_dalpha, trim_intercept, trim_slope, Cm_delta,
+                     -ddelta_e_dalpha * Cm_delta)
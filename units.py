@@ -0,0 +1,63 @@
+"""
+Unit conversion factors and physical constants shared by all modules.
+
+Factors are named <from>_to_<to> and converted by multiplying, e.g. weight [N] * N_to_lbs gives
+the mass in lbs. Combined factors are computed once here, so the hot paths do a single multiply.
+The conversion functions accept scalars, lists and NumPy arrays.
+"""
+import numpy as np
+
+g0 = 9.80665  # [m/s**2]
+
+# Exact definitions
+lbs_to_kg = 0.45359237  # [-]
+inch_to_m = 0.0254  # [-]
+ft_to_m = 0.3048  # [-]
+kts_to_ms = 1852 / 3600  # [-]
+deg_to_rad = np.pi / 180  # [-]
+rad_to_deg = 180 / np.pi  # [-]
+
+# Combined factors
+kg_to_lbs = 1 / lbs_to_kg  # [-]
+N_to_kg = 1 / g0  # [-]
+N_to_lbs = 1 / (g0 * lbs_to_kg)  # [-]
+
+
+def _array(value):
+    """Lists and tuples as arrays, scalars and arrays unchanged."""
+    return np.asarray(value) if isinstance(value, (list, tuple)) else value
+
+
+def weight_to_lbs(weight):
+    """
+    :param weight: weight [N]
+    :return: mass [lbs]
+    """
+    return _array(weight) * N_to_lbs
+
+
+def mass_to_lbs(mass):
+    """
+    :param mass: mass [kg]
+    :return: mass [lbs]
+    """
+    return _array(mass) * kg_to_lbs
+
+
+def xcg_from_datum(xcg_datum, x_mac):
+    """
+    :param xcg_datum: location with respect to the fuselage datum [inch]
+    :param x_mac: location of the MAC with respect to the datum [inch]
+    :return: location with respect to the MAC [m]
+    """
+    return (_array(xcg_datum) - x_mac) * inch_to_m
+
+
+def mac_fraction(arm, x_LEMAC, MAC):
+    """
+    :param arm: location with respect to the fuselage datum [m]
+    :param x_LEMAC: location of the leading edge of the MAC [m]
+    :param MAC: mean aerodynamic chord [m]
+    :return: x_cg/MAC [-]
+    """
+    return (_array(arm) - x_LEMAC) / MAC
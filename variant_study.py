@@ -0,0 +1,104 @@
+import itertools
+import os
+from dataclasses import replace
+
+from boarding import boarding_extremes
+from instrumentation import timed
+from load_diagram import Battery, compute_load_diagram
+
+
+def variant_grid(base, **axes):
+    """
+    All combinations of configuration changes, e.g. variant_grid(crjexx(), OEW=[20000, 21000], margin=[0.02, 0.05]).
+
+    :param base: LoadingConfiguration the variants start from
+    :param axes: LoadingConfiguration field names with the values to try
+    :return: list of LoadingConfiguration, named '<base name>-<index>'
+    """
+    names = list(axes)
+    return [replace(base, name=f"{base.name}-{i}", **dict(zip(names, values)))
+            for i, values in enumerate(itertools.product(*axes.values()))]
+
+
+def battery_grid(base, forward_mass, aft_mass, forward_arm=None, aft_arm=None):
+    """
+    Battery mass and location trade-off around a configuration with a forward and an aft battery.
+
+    :param base: LoadingConfiguration with two batteries, forward first
+    :param forward_mass: forward battery masses to try [kg]
+    :param aft_mass: aft battery masses to try [kg]
+    :param forward_arm: forward battery locations to try [m], the base location by default
+    :param aft_arm: aft battery locations to try [m], the base location by default
+    :return: list of LoadingConfiguration
+    """
+    forward, aft = base.batteries
+    forward_arm = [forward.arm] if forward_arm is None else forward_arm
+    aft_arm = [aft.arm] if aft_arm is None else aft_arm
+    batteries = [(Battery(forward.name, fm, fa), Battery(aft.name, am, aa))
+                 for fm, am, fa, aa in itertools.product(forward_mass, aft_mass, forward_arm, aft_arm)]
+    return variant_grid(base, batteries=batteries)
+
+
+@timed()
+def evaluate_variant(config):
+    """
+    Load diagram and boarding cg envelope of one configuration, as one table row.
+
+    :param config: LoadingConfiguration
+    :return: dict of the configuration inputs and the computed cg range
+    """
+    diagram = compute_load_diagram(config)
+    boarding = boarding_extremes(diagram)
+    row = {
+        "name": config.name,
+        "OEW": config.OEW,
+        "oew_arm": config.oew_arm,
+        "max_payload": config.max_payload,
+        "no_pass": config.no_pass,
+    }
+    for battery in config.batteries:
+        row[battery.name + " mass"] = battery.mass
+        row[battery.name + " arm"] = battery.arm
+    row.update({
+        "min_cg": diagram.min_cg,
+        "max_cg": diagram.max_cg,
+        "min_margin_cg": diagram.min_margin_cg,
+        "max_margin_cg": diagram.max_margin_cg,
+        "cg_range": diagram.max_margin_cg - diagram.min_margin_cg,
+        "min_weight": diagram.min_weight,
+        "max_weight": diagram.max_weight,
+        "boarding_min_cg": boarding.min_cg,
+        "boarding_max_cg": boarding.max_cg,
+    })
+    return row
+
+
+def run_study(variants, processes=None, chunksize=None):
+    """
+    Evaluate many configurations on a process pool and collect the results in one table.
+
+    :param variants: iterable of LoadingConfiguration, e.g. from variant_grid or battery_grid
+    :param processes: number of worker processes, all cores by default; 1 runs in this process
+    :param chunksize: variants sent to a worker at once, by default about four chunks per worker
+    :return: pandas DataFrame with one row per variant, in the order of variants
+    """
+    import pandas as pd
+
+    variants = list(variants)
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(variants) < 2:
+        rows = [evaluate_variant(config) for config in variants]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunksize = chunksize or max(1, len(variants) // (4 * processes))
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            rows = list(pool.map(evaluate_variant, variants, chunksize=chunksize))
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    from load_diagram import crjexx
+
+    study = run_study(battery_grid(crjexx(), forward_mass=range(1000, 2001, 100), aft_mass=range(1000, 2001, 100)))
+    print(study.sort_values("cg_range").head(10).to_string())